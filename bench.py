@@ -0,0 +1,225 @@
+""" Benchmarks of the stypes unpack and pack paths.
+
+python bench.py [name ...]
+
+Runs the named benchmarks, or all of them, and prints the best time per
+record of each variant.
+"""
+from __future__ import print_function
+import sys
+import timeit
+
+from stypes import Array, Dict, Integer, NamedTuple, Numeric, String
+
+RECORDS = 2000
+REPEAT = 5
+
+def _spec():
+    return Dict([
+        ('name', String(20)),
+        ('age', Integer(3)),
+        ('amount', Numeric('S9(7).99')),
+        ('rate', Numeric('9V999')),
+        ('items', Array(3, NamedTuple([('code', String(4)),
+                                       ('qty', Integer(4))]))),
+        ('notes', String(30))])
+
+def _lines(spec):
+    rec = {'name': 'Jeremy Lowery', 'age': 31, 'amount': 12345.67,
+           'rate': 1.25, 'items': [('ab', 1), ('cd', 20), ('ef', 300)],
+           'notes': 'nothing to see here'}
+    return [spec.pack(rec)] * RECORDS
+
+def _run(label, func):
+    best = min(timeit.repeat(func, number=1, repeat=REPEAT))
+    print("  %-28s %8.2f us/record" % (label, best / RECORDS * 1e6))
+    return best
+
+def bench_compile():
+    """ Interpreted against compiled unpack and pack """
+    spec = _spec()
+    fast = spec.compile()
+    lines = _lines(spec)
+    recs = [spec.unpack(l) for l in lines]
+    slow_unpack = _run('unpack', lambda: [spec.unpack(l) for l in lines])
+    fast_unpack = _run('compiled unpack',
+                       lambda: [fast.unpack(l) for l in lines])
+    slow_pack = _run('pack', lambda: [spec.pack(r) for r in recs])
+    fast_pack = _run('compiled pack', lambda: [fast.pack(r) for r in recs])
+    print("  speedup: unpack %.1fx, pack %.1fx" % (
+        slow_unpack / fast_unpack, slow_pack / fast_pack))
+
+class _NestedDict(Dict):
+    """ A Dict with its own unpack, which is unpacked as a single field of
+    the record holding it, like containers were before flattening """
+    def unpack(self, s):
+        return Dict.unpack(self, s)
+
+class _NestedArray(Array):
+    def unpack(self, s):
+        return Array.unpack(self, s)
+
+def bench_nested():
+    """ Flattened against field by field unpacking of a nested spec """
+    def nested(dict_type, array_type):
+        return Dict([
+            ('id', Integer(6)),
+            ('items', array_type(5, dict_type([('line', Integer(3)),
+                                               ('code', String(6)),
+                                               ('qty', Integer(4))])))])
+    spec = nested(Dict, Array)
+    slow_spec = nested(_NestedDict, _NestedArray)
+    rec = {'id': 1,
+           'items': [{'line': i, 'code': 'abc', 'qty': i} for i in range(5)]}
+    lines = [spec.pack(rec)] * RECORDS
+    assert slow_spec.unpack(lines[0]) == spec.unpack(lines[0])
+    slow = _run('unpack nested', lambda: [slow_spec.unpack(l) for l in lines])
+    fast = _run('unpack flattened', lambda: [spec.unpack(l) for l in lines])
+    print("  speedup: %.1fx" % (slow / fast))
+
+def bench_numeric():
+    """ Numeric decoding with the compiled picture against the converters
+    """
+    cases = [('9(6)V99', b"01234567"), ('999.99', b"123.45"),
+             ('S9(5)V99', b"-0012345"), ('999,999.99', b"123,456.78")]
+    for picture, text in cases:
+        spec = Numeric(picture)
+        texts = [text] * RECORDS
+        slow = _run(picture + ' converters',
+                    lambda: [spec._convert(t.decode()) for t in texts])
+        fast = _run(picture + ' from_bytes',
+                    lambda: [spec.from_bytes(t) for t in texts])
+        print("  speedup: %.1fx" % (slow / fast))
+
+def bench_numeric_pack():
+    """ Numeric encoding with the compiled picture against the converters
+    """
+    from decimal import Decimal
+    cases = [('9(6)V99', Decimal('12345.67')), ('999.99', 123.45),
+             ('S9(5)V99', Decimal('-123.45')),
+             ('999,999.99', Decimal('123456.78'))]
+    for picture, value in cases:
+        spec = Numeric(picture)
+        values = [value] * RECORDS
+        fmt = spec._precision_fmt
+        slow = _run(picture + ' converters',
+                    lambda: [spec._write_text(v, fmt % abs(v))
+                             for v in values])
+        fast = _run(picture + ' to_bytes',
+                    lambda: [spec.to_bytes(v) for v in values])
+        print("  speedup: %.1fx" % (slow / fast))
+
+def bench_numeric_types():
+    """ Numeric decoding into each result type """
+    texts = [b"0012345.67"] * RECORDS
+    for as_ in ['decimal', 'int_scaled', 'float']:
+        spec = Numeric('9(7).99', as_=as_)
+        _run(as_, lambda: [spec.from_bytes(t) for t in texts])
+        values = [spec.from_bytes(t) for t in texts]
+        _run(as_ + ' sum', lambda: sum(values))
+
+def bench_date():
+    """ Compiled Date and Datetime formats against strptime and strftime """
+    import datetime
+    import time
+    from stypes import Date, Datetime
+    cases = [(Date, '%Y%m%d', datetime.date(2004, 1, 31)),
+             (Date, '%m/%d/%Y', datetime.date(2004, 1, 31)),
+             (Datetime, '%Y%m%d %H%M%S',
+              datetime.datetime(2010, 5, 2, 13, 30, 25))]
+    for cls, fmt, value in cases:
+        spec = cls(fmt)
+        texts = [value.strftime(fmt).encode()] * RECORDS
+        values = [value] * RECORDS
+        slow = _run(fmt + ' strptime',
+                    lambda: [time.strptime(t.decode(), fmt) for t in texts])
+        fast = _run(fmt + ' from_bytes',
+                    lambda: [spec.from_bytes(t) for t in texts])
+        slow_pack = _run(fmt + ' strftime',
+                         lambda: [v.strftime(fmt).encode() for v in values])
+        fast_pack = _run(fmt + ' to_bytes',
+                         lambda: [spec.to_bytes(v) for v in values])
+        print("  speedup: from_bytes %.1fx, to_bytes %.1fx" % (
+            slow / fast, slow_pack / fast_pack))
+
+def bench_cached():
+    """ Cached against plain conversions of repeated field values """
+    import random
+    from stypes import Cached, Date, MappedString
+    random.seed(0)
+    states = dict((c, c.lower()) for c in ['AL', 'AK', 'AZ', 'CA', 'NY'])
+    cases = [(Date('%Y%m%d'), [b"200401%02d" % random.randint(1, 28)
+                              for _ in range(RECORDS)]),
+             (Numeric('S9(5)V99'), [b"-00123%02d" % random.randint(0, 9)
+                                    for _ in range(RECORDS)]),
+             (MappedString(2, states), [random.choice(list(states)).encode()
+                                        for _ in range(RECORDS)])]
+    for spec, texts in cases:
+        name = type(spec).__name__
+        cached = Cached(spec)
+        slow = _run(name, lambda: [spec.unpack(t) for t in texts])
+        fast = _run('Cached ' + name, lambda: [cached.unpack(t) for t in texts])
+        print("  speedup: %.1fx" % (slow / fast))
+
+def bench_memory():
+    """ Memory per record of Dict, NamedTuple and Record values """
+    import tracemalloc
+    from stypes import Record
+    fields = [('name', String(20)), ('age', Integer(3)),
+              ('amount', Numeric('S9(7).99')), ('code', String(4)),
+              ('city', String(15)), ('zip', Integer(5))]
+    line = b"Jeremy Lowery       031-0012345.67ABCDSpringfield    12345"
+    for spec in [Dict(fields), NamedTuple(fields), Record(fields)]:
+        name = type(spec).__name__
+        _run(name + ' unpack', lambda: [spec.unpack(line)
+                                        for _ in range(RECORDS)])
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        recs = [spec.unpack(line) for _ in range(RECORDS)]
+        size = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        print("  %-28s %8d bytes/record" % (name + ' memory',
+                                            size // len(recs)))
+
+def bench_strings():
+    """ Plain, interned and dictionary encoded columns of repeated text """
+    import random
+    import tracemalloc
+    random.seed(0)
+    cities = [b"%-12s" % c for c in [b"Springfield", b"Shelbyville",
+                                     b"Ogdenville", b"North Haverbrook"]]
+    data = b"".join(random.choice(cities)[:12] + b"\n"
+                    for _ in range(RECORDS))
+    for label, field in [('plain', String(12)),
+                         ('intern', String(12, intern=64)),
+                         ('dictionary', String(12, dictionary=True))]:
+        spec = Dict([('city', field)])
+        _run(label + ' unpack_columns', lambda: spec.unpack_columns(data))
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        cols = spec.unpack_columns(data)
+        size = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        print("  %-28s %8d bytes/record" % (label + ' memory',
+                                            size // RECORDS))
+
+BENCHMARKS = [
+    ('compile', bench_compile),
+    ('nested', bench_nested),
+    ('numeric', bench_numeric),
+    ('numeric_pack', bench_numeric_pack),
+    ('numeric_types', bench_numeric_types),
+    ('date', bench_date),
+    ('cached', bench_cached),
+    ('memory', bench_memory),
+    ('strings', bench_strings)]
+
+def main(names):
+    for name, func in BENCHMARKS:
+        if names and name not in names:
+            continue
+        print("%s: %s" % (name, func.__doc__.strip()))
+        func()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
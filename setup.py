@@ -116,6 +116,10 @@ or download from PyPI at https://pypi.python.org/pypi/stypes/ """ ,
         "future",
         "ordereddict; python_version < '3.0'"
     ],
+    extras_require={
+        'arrow': ['pyarrow'],
+        'numpy': ['numpy'],
+    },
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Intended Audience :: Developers',
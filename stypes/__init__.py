@@ -1,18 +1,31 @@
 __all__ = ['unpack', 'pack', 'spec', 'Integer', 'String', 'Record', 'Array',
 'List', 'Tuple', 'UnconvertedValue', 'NamedTuple', 'SpecificationError',
-'NumericFormatError', 'Numeric', 'BoxedString']
+'NumericFormatError', 'Numeric', 'Packed', 'Binary', 'BoxedString', 'iter_unpack',
+'RecordFile', 'RecordWriter', 'Dispatch', 'parallel_unpack', 'parallel_map',
+'aiter_unpack', 'AsyncRecordWriter', 'unpack_arrays', 'read_arrow',
+'to_arrow_schema', 'Cached', 'DictionaryColumn']
 
 __version__ = "0.23.1"
+from .aio import aiter_unpack, AsyncRecordWriter
+from .arrow import read_arrow, to_arrow_schema
+from .cached import Cached
 from .date import Date, Datetime
+from .dispatch import Dispatch
 from .mapping import Dict
 try:
     from .odict import OrderedDict
 except ImportError:
     pass
-from .numeric import Integer, Numeric, NumericFormatError
+from .numeric import Integer, Numeric, NumericFormatError, Packed, Binary
+from .parallel import parallel_unpack, parallel_map
+from .record import Record
+from .recordfile import RecordFile
 from .sequence import Array, List, Tuple, NamedTuple
-from .spec import SpecificationError, String, Spec, MappedString, BoxedString
+from .spec import (SpecificationError, String, Spec, MappedString, BoxedString,
+                   DictionaryColumn)
+from .stream import iter_unpack, RecordWriter
 from .util import UnconvertedValue
+from .vectorized import unpack_arrays
 
 ## Layout Entry Points
 def unpack(string, spec):
@@ -0,0 +1,86 @@
+""" asyncio counterparts of the streaming reader and writer. """
+import asyncio
+
+from .spec import Spec
+from .stream import _Framer
+
+__all__ = ['aiter_unpack', 'AsyncRecordWriter']
+
+DEFAULT_BATCH_SIZE = 1024
+
+async def aiter_unpack(reader, spec, terminator=b"\n", batch_size=None):
+    """ Asynchronously iterate over the records read from an
+    asyncio.StreamReader.
+
+    async for rec in aiter_unpack(reader, spec):
+        ...
+
+    At most batch_size records are read and decoded at a time. Control is
+    given back to the event loop between batches so decoding a fast stream
+    does not starve other tasks.
+    """
+    if not isinstance(spec, Spec):
+        from .mapping import Dict
+        spec = Dict(spec)
+    if batch_size is None:
+        batch_size = DEFAULT_BATCH_SIZE
+    framer = _Framer(spec.width, terminator)
+    read_size = framer.stride * batch_size
+    while True:
+        data = await reader.read(read_size)
+        if not data:
+            break
+        block = framer.feed(data)
+        if block:
+            for rec in spec._iter_unpack_block(block, framer.stride):
+                yield rec
+        await asyncio.sleep(0)
+    block = framer.finish()
+    if block:
+        for rec in spec._iter_unpack_block(block, framer.stride):
+            yield rec
+
+class AsyncRecordWriter(object):
+    """ Writes records to an asyncio.StreamWriter buffer_records records at
+    a time, waiting for the stream to drain after each batch.
+
+    async with AsyncRecordWriter(writer, spec) as out:
+        for rec in recs:
+            await out.write(rec)
+    """
+    def __init__(self, writer, spec, terminator=b"\n", buffer_records=1024):
+        if not isinstance(spec, Spec):
+            from .mapping import Dict
+            spec = Dict(spec)
+        self._writer = writer
+        self._pack = spec.pack
+        self._terminator = terminator or b""
+        self._buffer_records = buffer_records
+        self._pending = []
+
+    async def write(self, rec):
+        self._pending.append(self._pack(rec))
+        if len(self._pending) >= self._buffer_records:
+            await self.flush()
+
+    async def write_many(self, recs):
+        for rec in recs:
+            await self.write(rec)
+
+    async def flush(self):
+        """ Write out all of the buffered records """
+        if self._pending:
+            data = self._terminator.join(self._pending) + self._terminator
+            self._pending = []
+            self._writer.write(data)
+        await self._writer.drain()
+
+    async def close(self):
+        """ Flush the buffered records. The stream is left open. """
+        await self.flush()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
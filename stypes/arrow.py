@@ -0,0 +1,147 @@
+""" Export of records to Apache Arrow.
+
+The schema is derived from the spec and record batches are built from
+columns decoded straight out of the raw record text, without creating a
+value for each record.
+
+Requires pyarrow.
+"""
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from .cached import Cached
+from .date import Date, Datetime
+from .numeric import Integer, Numeric, _MachineNumber
+from .spec import String, BoxedString, MappedString, DictionaryColumn
+from .stream import iter_blocks
+from .util import UnconvertedValue
+
+__all__ = ['to_arrow_schema', 'read_arrow']
+
+DEFAULT_BATCH_SIZE = 65536
+
+def to_arrow_schema(spec):
+    """ The pyarrow schema of the records of a Dict or NamedTuple spec """
+    _require_pyarrow()
+    return pa.schema([pa.field(name, _field_type(s))
+                      for name, s in _named_fields(spec)])
+
+def read_arrow(source, spec, batch_size=None, terminator=b"\n"):
+    """ Iterate over pyarrow RecordBatches of at most batch_size records
+    read from source, a file object or a bytes-like object. Values which
+    could not be converted become nulls. """
+    _require_pyarrow()
+    from .sequence import _block_fields
+    if batch_size is None:
+        batch_size = DEFAULT_BATCH_SIZE
+    schema = to_arrow_schema(spec)
+    fields = _named_fields(spec)
+    pending = [[] for _ in fields]
+    # The pending rows before start have been sent in a batch already
+    start = 0
+    for block, stride in iter_blocks(source, spec.width, terminator):
+        rows = _block_fields(spec, block, stride, spec._struct)
+        if start:
+            pending = [c[start:] for c in pending]
+            start = 0
+        for column, values in zip(pending, zip(*rows)):
+            column.extend(values)
+        while len(pending[0]) - start >= batch_size:
+            end = start + batch_size
+            yield _record_batch(schema, fields,
+                                [c[start:end] for c in pending])
+            start = end
+    if len(pending[0]) > start:
+        yield _record_batch(schema, fields, [c[start:] for c in pending])
+
+def _record_batch(schema, fields, raw_columns):
+    arrays = []
+    for (name, spec), raw, field in zip(fields, raw_columns, schema):
+        column = spec.unpack_column(raw)
+        if isinstance(column, DictionaryColumn):
+            arrays.append(_dictionary_array(column, field.type))
+            continue
+        if not isinstance(spec, Integer) or isinstance(column, list):
+            column = [_arrow_value(v, spec) for v in column]
+        arrays.append(pa.array(column, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def _dictionary_array(column, arrow_type):
+    """ A pyarrow DictionaryArray sharing the codes of a DictionaryColumn.
+    Records with a value which could not be converted become nulls. """
+    valid = [v is not None and not isinstance(v, UnconvertedValue)
+             for v in column.values]
+    if all(valid):
+        indices = pa.array(column.codes, type=arrow_type.index_type)
+    else:
+        indices = pa.array([c if valid[c] else None for c in column.codes],
+                           type=arrow_type.index_type)
+    values = pa.array([v if ok else '' for v, ok in zip(column.values, valid)],
+                      type=arrow_type.value_type)
+    return pa.DictionaryArray.from_arrays(indices, values)
+
+def _arrow_value(value, spec):
+    """ Convert a value to what pyarrow expects for the arrow type of the
+    spec. UnconvertedValues become nulls. """
+    from .mapping import _BaseDict
+    from .sequence import Array, BaseSequence
+    if value is None or isinstance(value, UnconvertedValue):
+        return None
+    if isinstance(spec, Array):
+        return [_arrow_value(v, spec._pos_specs[0]) for v in value]
+    if isinstance(spec, _BaseDict):
+        return dict((name, _arrow_value(value[name], s))
+                    for name, s in spec._spec_map)
+    if isinstance(spec, BaseSequence):
+        return dict((name, _arrow_value(v, s))
+                    for (name, s), v in zip(_named_fields(spec), value))
+    return value
+
+def _named_fields(spec):
+    from .mapping import _BaseDict
+    from .sequence import NamedTuple
+    if isinstance(spec, _BaseDict):
+        return list(spec._spec_map)
+    if isinstance(spec, NamedTuple):
+        return list(spec._key_map)
+    return [(str(i), s) for i, s in enumerate(spec._pos_specs)]
+
+def _field_type(spec):
+    """ The arrow type of a field of the record. Fields giving dictionary
+    encoded columns are only dictionary encoded at the top level. """
+    if getattr(spec, '_dictionary', False):
+        return pa.dictionary(pa.int32(), _arrow_type(spec))
+    return _arrow_type(spec)
+
+def _arrow_type(spec):
+    from .mapping import _BaseDict
+    from .sequence import Array, BaseSequence
+    if isinstance(spec, Cached):
+        return _arrow_type(spec.spec)
+    if isinstance(spec, Integer):
+        return pa.int64()
+    if isinstance(spec, (Numeric, _MachineNumber)):
+        if spec._as == 'int_scaled':
+            return pa.int64()
+        if spec._as == 'float':
+            return pa.float64()
+        return pa.decimal128(max(spec._digits, 1), spec._scale)
+    if isinstance(spec, Datetime):
+        return pa.timestamp('s')
+    if isinstance(spec, Date):
+        return pa.date32()
+    if isinstance(spec, Array):
+        return pa.list_(_arrow_type(spec._pos_specs[0]), spec._count)
+    if isinstance(spec, (_BaseDict, BaseSequence)):
+        return pa.struct([pa.field(name, _arrow_type(s))
+                          for name, s in _named_fields(spec)])
+    if isinstance(spec, (String, BoxedString, MappedString)) or \
+            not hasattr(spec, 'from_bytes'):
+        return pa.string()
+    raise TypeError("No arrow type is known for %r" % (spec,))
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Install pyarrow to export to arrow")
@@ -0,0 +1,101 @@
+""" Memoized conversions for fields which hold few distinct values, such as
+dates, state codes or plan codes repeated over millions of records.
+"""
+from collections import namedtuple
+
+from .spec import Spec
+from .util import LRUCache
+
+__all__ = ['Cached', 'CacheInfo']
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses maxsize currsize')
+
+_MISSING = object()
+
+class Cached(Spec):
+    """ Wraps the spec of a field and remembers the values of the last
+    maxsize distinct byte strings it unpacked, and the bytes of the last
+    maxsize values it packed.
+
+    spec = Dict([('opened', Cached(Date('%Y%m%d'), maxsize=4096)),
+                 ('premium', Cached(Numeric('9(5)V99')))])
+
+    The values are shared between records, so the wrapped spec should give
+    values which are not changed in place. Container specs can not be
+    cached. cache_info() gives the hits and misses.
+    """
+    def __new__(cls, spec=None, maxsize=1024):
+        # Specs reading the bytes themselves keep doing so when cached
+        if cls is Cached and type(spec).unpack is not Spec.unpack:
+            cls = _CachedUnpack
+        return Spec.__new__(cls)
+
+    def __init__(self, spec, maxsize=1024):
+        from .mapping import _BaseDict
+        from .sequence import BaseSequence
+        if isinstance(spec, (_BaseDict, BaseSequence)):
+            raise TypeError("Only the specs of single fields can be cached, "
+                            "not %r" % (spec,))
+        self.spec = spec
+        self.width = spec.width
+        self.maxsize = maxsize
+        self._values = LRUCache(maxsize)
+        self._texts = LRUCache(maxsize)
+
+    def cache_info(self):
+        """ The hits, misses, maxsize and current size of the unpack and
+        pack caches taken together """
+        return CacheInfo(self._values.hits + self._texts.hits,
+                         self._values.misses + self._texts.misses,
+                         self.maxsize, len(self._values) + len(self._texts))
+
+    def cache_clear(self):
+        self._values.clear()
+        self._texts.clear()
+
+    def from_bytes(self, text):
+        value = self._values.get(text, _MISSING)
+        if value is _MISSING:
+            value = self._values[text] = self.spec.unpack(text)
+        return value
+
+    def to_bytes(self, value):
+        return self._lookup_text(value, self._convert_value)
+
+    def _convert_value(self, value):
+        if hasattr(self.spec, 'to_bytes'):
+            return self.spec.to_bytes(value)
+        return value.encode()
+
+    def _lookup_text(self, value, convert):
+        # 1, 1.0 and True are equal but need not be packed the same
+        key = (type(value), value)
+        try:
+            text = self._texts.get(key, _MISSING)
+        except TypeError:
+            # Not hashable
+            return convert(value)
+        if text is _MISSING:
+            text = self._texts[key] = convert(value)
+        return text
+
+    ## pickle protocol. The caches are not kept
+    def __reduce__(self):
+        return (Cached, (self.spec, self.maxsize))
+
+class _CachedUnpack(Cached):
+    """ Cached spec of a field with its own unpack and pack, such as Packed,
+    which is given the bytes of the field as they are """
+    def unpack(self, s):
+        s = bytes(s)
+        value = self._values.get(s, _MISSING)
+        if value is _MISSING:
+            value = self._values[s] = self.spec.unpack(s)
+        return value
+
+    def unpack_column(self, values):
+        unpack = self.unpack
+        return [unpack(s) for s in values]
+
+    def pack(self, value):
+        return self._lookup_text(value, self.spec.pack)
@@ -0,0 +1,74 @@
+""" Single byte codepages, such as the EBCDIC cp037 and cp500 of mainframe
+files.
+
+Records in a codepage are translated into latin-1 with bytes.translate, a
+whole record or block of records at a time, so the fields hold ASCII digits
+and punctuation. Text fields which are not plain ASCII are then handed to
+their specs as UTF-8, like the text of any other record.
+"""
+__all__ = ['translation_tables']
+
+_tables = {}
+
+def translation_tables(encoding):
+    """ The bytes.translate tables which turn text in the single byte
+    encoding into latin-1 and back """
+    try:
+        return _tables[encoding]
+    except KeyError:
+        pass
+    all_bytes = bytes(bytearray(range(256)))
+    try:
+        latin = all_bytes.decode(encoding).encode('latin-1')
+    except (UnicodeError, LookupError):
+        latin = b''
+    if len(latin) != 256 or len(set(latin)) != 256:
+        raise ValueError("%r is not a single byte encoding of the latin-1 "
+                         "characters" % (encoding,))
+    tables = (bytes.maketrans(all_bytes, latin),
+              bytes.maketrans(latin, all_bytes))
+    _tables[encoding] = tables
+    return tables
+
+_ASCII = bytes(bytearray(range(128)))
+
+def _isascii(text):
+    """ bytes.isascii(), which Python 3.6 does not have """
+    return not text.translate(None, _ASCII)
+
+def to_utf8(text):
+    """ Field text translated to latin-1, as UTF-8 """
+    if _isascii(text):
+        return text
+    return text.decode('latin-1').encode('utf-8')
+
+def text_encoder(spec, encoding, width):
+    """ A function which packs a value of the text field spec, width bytes
+    wide, in the encoding. Text is encoded before it is cut to the width, so
+    characters which take several bytes in UTF-8 still fit. """
+    from .spec import Spec
+    encode_table = translation_tables(encoding)[1]
+    space = ' '.encode(encoding)
+    if type(spec).pack is not Spec.pack:
+        to_bytes = spec.pack
+    elif hasattr(spec, 'to_bytes'):
+        to_bytes = spec.to_bytes
+    else:
+        to_bytes = lambda value: value.encode()
+
+    def encode(value):
+        text = to_bytes(value)
+        if _isascii(text):
+            return text[:width].ljust(width).translate(encode_table)
+        text = text.decode('utf-8', 'ignore').encode(encoding, 'replace')
+        return text[:width].ljust(width, space)
+    return encode
+
+def raw_decoder(encoding):
+    """ A function which turns field bytes translated to latin-1 back into
+    the bytes of the file, for fields which are not text """
+    encode_table = translation_tables(encoding)[1]
+
+    def decode(text):
+        return text.translate(encode_table)
+    return decode
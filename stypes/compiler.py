@@ -0,0 +1,193 @@
+""" Compiles a spec into specialized unpack and pack functions.
+
+The interpreted specs walk their fields at run time: every field goes through
+the unpack() of its spec, which checks the input type, looks for from_bytes,
+strips the text and finally converts it. A compiled spec generates the source
+of a function for the whole spec tree instead. All of the leaf fields, nested
+ones included, are pulled out of the record with a single struct and the
+stripping and conversion of each field is written out inline, so unpacking a
+record is one function call building the values directly.
+
+The values are the same as the ones given by the spec, including the value
+types, so rec.pack() and the rest of the value protocols keep working.
+"""
+import struct
+
+import six
+
+from .mapping import _BaseDict
+from .sequence import (BaseSequence, _flattens, _framed_struct,
+                       _slices_struct_fmt)
+from .spec import Spec, String
+
+__all__ = ['CompiledSpec', 'compile_spec']
+
+def compile_spec(spec):
+    """ A CompiledSpec for a Dict, OrderedDict or sequence spec """
+    return CompiledSpec(spec)
+
+class CompiledSpec(Spec):
+    """ A spec with generated unpack and pack functions for the records of
+    another spec. It can be used wherever the spec itself is used.
+
+    fast = spec.compile()
+    rec = fast.unpack(line)
+
+    The generated code is kept in the source attribute.
+    """
+    def __init__(self, spec):
+        if not _flattens(spec):
+            raise TypeError("Only Dict and sequence specs without an "
+                "encoding, a lazy or a custom unpack can be compiled, not %r"
+                % (spec,))
+        self.spec = spec
+        self.width = spec.width
+        self._compile()
+
+    def _compile(self):
+        gen = _Generator()
+        expr = gen.unpack_expr(self.spec, 0)
+        self._struct = struct.Struct(
+            _slices_struct_fmt(gen.leaves, self.spec.width))
+        gen.names.update({
+            '_text': six.text_type if six.PY3 else (),
+            '_error': struct.error,
+            '_unpack_from': self._struct.unpack_from,
+            '_unpack': self._struct.unpack,
+            '_size': self._struct.size})
+        fields = ''.join('f%d, ' % i for i in range(len(gen.leaves)))
+        lines = [
+            "def unpack_from(buffer, offset=0):",
+            "    if isinstance(buffer, _text):",
+            "        buffer = buffer.encode()",
+            "    try:",
+            "        (%s) = _unpack_from(buffer, offset)" % fields,
+            "    except _error:",
+            "        (%s) = _unpack(bytes(buffer[offset:offset+_size])"
+                ".ljust(_size))" % fields,
+            "    return %s" % expr,
+            "",
+            "def iter_rows(rows):",
+            "    for (%s) in rows:" % fields,
+            "        yield %s" % expr,
+            ""]
+        if _contiguous(self.spec):
+            stmts, parts = [], []
+            gen.pack_parts(self.spec, 'rec', stmts, parts)
+            lines.append("def pack(rec):")
+            if stmts:
+                lines.append("    try:")
+                lines.extend("        " + s for s in stmts)
+                lines.extend([
+                    "    except KeyError as e:",
+                    "        raise KeyError('Specification requires value "
+                        "to have a %r key' % e.args)"])
+            lines.append("    return b''.join((%s))" %
+                         ''.join(p + ', ' for p in parts))
+        else:
+            # Blanks have to be written between the fields
+            gen.names['pack'] = self.spec.pack
+        self.source = "\n".join(lines) + "\n"
+        six.exec_(self.source, gen.names)
+        self._unpack_from = gen.names['unpack_from']
+        self._iter_rows = gen.names['iter_rows']
+        self._pack = gen.names['pack']
+
+    ## unpack
+    def unpack(self, text_line):
+        return self._unpack_from(text_line)
+
+    def unpack_from(self, buffer, offset=0):
+        return self._unpack_from(buffer, offset)
+
+    def _iter_unpack_block(self, block, stride):
+        return self._iter_rows(
+            _framed_struct(self._struct, stride).iter_unpack(block))
+
+    ## pack
+    def pack(self, value):
+        return self._pack(value)
+
+    ## pickle protocol. The generated functions are compiled again
+    def __getstate__(self):
+        return {'spec': self.spec}
+
+    def __setstate__(self, state):
+        self.__init__(state['spec'])
+
+class _Generator(object):
+    """ Builds the expressions of the generated functions. The objects the
+    code refers to are bound to names in the names dict. """
+    def __init__(self):
+        self.names = {}
+        self.leaves = []
+
+    def name(self, obj, prefix):
+        name = '%s%d' % (prefix, len(self.names))
+        self.names[name] = obj
+        return name
+
+    def unpack_expr(self, spec, offset):
+        """ The expression for the value of spec, found at offset in the
+        record """
+        if _flattens(spec):
+            items = [self.unpack_expr(s, offset + start)
+                     for s, (start, end) in zip(_children(spec),
+                                                spec._field_slices)]
+            spec_name = self.name(spec, 'S')
+            if isinstance(spec, _BaseDict):
+                return "%s({%s}, %s)" % (
+                    self.name(spec._value_type, 'V'),
+                    ', '.join('%r: %s' % (n, i)
+                              for (n, s), i in zip(spec._spec_map, items)),
+                    spec_name)
+            return "%s([%s], %s)" % (self.name(spec._itype, 'V'),
+                                     ', '.join(items), spec_name)
+
+        var = 'f%d' % len(self.leaves)
+        self.leaves.append((offset, offset + spec.width))
+        if type(spec).unpack is not Spec.unpack:
+            return "%s(%s)" % (self.name(spec.unpack, 'U'), var)
+        if hasattr(spec, 'from_bytes'):
+            return "%s(%s.rstrip())" % (self.name(spec.from_bytes, 'C'), var)
+        return "%s.decode().rstrip()" % var
+
+    def pack_parts(self, spec, var, stmts, parts):
+        """ Add the statements looking up the values of the fields of the
+        value in var to stmts and the expressions for their bytes to parts
+        """
+        if _flattens(spec) and type(spec).pack in (_BaseDict.pack,
+                                                  BaseSequence.pack):
+            if isinstance(spec, _BaseDict):
+                keys = [repr(n) for n, s in spec._spec_map]
+            else:
+                keys = [str(i) for i in range(len(spec._pos_specs))]
+            for key, child in zip(keys, _children(spec)):
+                child_var = 'v%d' % len(stmts)
+                stmts.append("%s = %s[%s]" % (child_var, var, key))
+                self.pack_parts(child, child_var, stmts, parts)
+            return
+
+        width = spec.width
+        if type(spec).pack is not Spec.pack:
+            parts.append("%s(%s)" % (self.name(spec.pack, 'P'), var))
+        elif type(spec) is String:
+            parts.append("(%r if %s is None else %s.encode()[:%d].ljust(%d))"
+                         % (b" " * width, var, var, width, width))
+        elif hasattr(spec, 'to_bytes'):
+            parts.append("%s(%s)[:%d].ljust(%d)" % (
+                self.name(spec.to_bytes, 'T'), var, width, width))
+        else:
+            parts.append("%s.encode()[:%d].ljust(%d)" % (var, width, width))
+
+def _children(spec):
+    if isinstance(spec, _BaseDict):
+        return [s for n, s in spec._spec_map]
+    return spec._pos_specs
+
+def _contiguous(spec):
+    """ If the fields of spec and of its inlined fields fill the record with
+    nothing between them """
+    if not _flattens(spec):
+        return True
+    return spec._contiguous and all(_contiguous(s) for s in _children(spec))
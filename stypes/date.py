@@ -1,4 +1,5 @@
 import datetime
+from operator import attrgetter
 import time
 import re
 
@@ -9,6 +10,7 @@ class Date(Spec):
     def __init__(self, fmt):
         self._fmt = fmt
         self._width = _formatter_width(fmt)
+        self._plan = _FormatPlan.compile(fmt, datetime.date)
 
     @property
     def width(self):
@@ -17,6 +19,10 @@ class Date(Spec):
     def from_bytes(self, text):
         if not text.strip():
             return None
+        if self._plan is not None:
+            value = self._plan.parse(text)
+            if value is not None:
+                return value
         try:
             t = time.strptime(text.decode(), self._fmt)
         except ValueError:
@@ -27,12 +33,17 @@ class Date(Spec):
     def to_bytes(self, value):
         if value is None:
             return b' '*self.width
+        if self._plan is not None:
+            text = self._plan.format(value)
+            if text is not None:
+                return text
         return value.strftime(self._fmt).encode()
 
 class Datetime(Spec):
     def __init__(self, fmt):
         self._fmt = fmt
         self._width = _formatter_width(fmt)
+        self._plan = _FormatPlan.compile(fmt, datetime.datetime)
 
     @property
     def width(self):
@@ -41,6 +52,10 @@ class Datetime(Spec):
     def from_bytes(self, text):
         if not text.strip():
             return None
+        if self._plan is not None:
+            value = self._plan.parse(text)
+            if value is not None:
+                return value
         try:
             t = time.strptime(text.decode(), self._fmt)
         except ValueError:
@@ -50,8 +65,102 @@ class Datetime(Spec):
     def to_bytes(self, value):
         if value is None:
             return b' '*self.width
+        if self._plan is not None:
+            text = self._plan.format(value)
+            if text is not None:
+                return text
         return value.strftime(self._fmt).encode()
 
+class _FormatPlan(object):
+    """ A format made only of numeric date and time fields and literal text,
+    compiled into a regular expression with a group for each field and a
+    %-format string with the field attributes to fill it in.
+
+    parse() and format() give None for anything they cannot do exactly like
+    time.strptime and strftime, which are then used instead. """
+    # The fields of a datetime, in order, with their defaults in strptime
+    _FIELDS = ('year', 'month', 'day', 'hour', 'minute', 'second')
+    _DEFAULTS = (1900, 1, 1, 0, 0, 0)
+    _DIRECTIVES = {'%Y': ('year', 4), '%y': ('year', 2), '%m': ('month', 2),
+                   '%d': ('day', 2), '%H': ('hour', 2), '%M': ('minute', 2),
+                   '%S': ('second', 2)}
+
+    @classmethod
+    def compile(cls, fmt, result):
+        """ The plan for fmt giving values of the result type, date or
+        datetime, or None if fmt has other directives """
+        pattern = []
+        template = []
+        fields = []
+        short_year = False
+        for token in re.findall('%.|[^%]+|%$', fmt):
+            if token in cls._DIRECTIVES:
+                field, width = cls._DIRECTIVES[token]
+                if field in fields:
+                    return None
+                fields.append(field)
+                short_year = short_year or token == '%y'
+                pattern.append('([0-9]{%d})' % width)
+                template.append('%%0%dd' % width)
+            elif token == '%%' or not token.startswith('%'):
+                text = token[1:] if token == '%%' else token
+                pattern.append(re.escape(text))
+                template.append(text.replace('%', '%%'))
+            else:
+                return None
+        if not fields:
+            return None
+        return cls(fmt, result, ''.join(pattern), ''.join(template), fields,
+                   short_year)
+
+    def __init__(self, fmt, result, pattern, template, fields, short_year):
+        self._fmt = fmt
+        self._result = result
+        self._regex = re.compile(pattern.encode() + b'$')
+        self._template = template
+        self._indexes = [self._FIELDS.index(f) for f in fields]
+        self._has_time = max(self._indexes) > 2
+        # Position of the two digit year in the values given to the template
+        self._short_year = fields.index('year') + 1 if short_year else None
+        self._getter = attrgetter('year', *fields)
+
+    def __reduce__(self):
+        return (_FormatPlan.compile, (self._fmt, self._result))
+
+    def parse(self, text):
+        """ The value in text """
+        match = self._regex.match(text)
+        if match is None:
+            return None
+        values = list(self._DEFAULTS)
+        for idx, digits in zip(self._indexes, match.groups()):
+            values[idx] = int(digits)
+        if self._short_year is not None:
+            values[0] += 2000 if values[0] <= 68 else 1900
+        try:
+            if self._result is datetime.datetime:
+                return datetime.datetime(*values)
+            if self._has_time:
+                # Checks the time fields like strptime does
+                return datetime.datetime(*values).date()
+            return datetime.date(*values[:3])
+        except ValueError:
+            return None
+
+    def format(self, value):
+        """ The bytes of the date or datetime value """
+        try:
+            values = self._getter(value)
+        except AttributeError:
+            return None
+        # strftime does not pad years before 1000 on every platform
+        if values[0] < 1000:
+            return None
+        if self._short_year is not None:
+            values = list(values)
+            values[self._short_year] %= 100
+        return (self._template % tuple(values[1:])).encode()
+
 def _formatter_width(fmt):
     formatters = re.findall("%.", fmt)
     fixed_chars = re.sub("%.", "", fmt)
@@ -0,0 +1,140 @@
+""" Files which interleave several kinds of records, such as the header,
+detail and trailer records of a COBOL extract. The kind of each record is
+given by a type code found at the same position in every record.
+"""
+import six
+
+from .compiler import CompiledSpec
+from .spec import Spec, SpecificationError
+from .stream import DEFAULT_CHUNK_SIZE
+from .util import UnconvertedValue
+
+__all__ = ['Dispatch']
+
+class Dispatch(Spec):
+    """ Picks the spec for a record by looking at the raw bytes of its type
+    code before anything is decoded.
+
+    spec = Dispatch(0, 1, {'H': header, 'D': detail, 'T': trailer})
+
+    offset and width give the position of the type code in the record.
+    Records with a code not in the map are unpacked with the default spec
+    if one is given, otherwise they are returned as an UnconvertedValue.
+    """
+    def __init__(self, offset, width, spec_map, default=None):
+        self._code_offset = offset
+        self._code_width = width
+        self._specs = {}
+        for code, spec in spec_map.items():
+            if six.PY3 and isinstance(code, str):
+                code = code.encode()
+            if len(code) != width:
+                raise SpecificationError("Record type code %r is not %d "
+                    "bytes wide" % (code, width))
+            self._specs[code] = _as_spec(spec)
+        self._default = None if default is None else _as_spec(default)
+        specs = list(self._specs.values())
+        if self._default is not None:
+            specs.append(self._default)
+        if not specs:
+            raise SpecificationError("No record types given")
+        self.width = max(s.width for s in specs)
+        # The spec which packs the values of each spec. Values unpacked by
+        # a compiled spec refer to the spec it was compiled from.
+        self._packers = {}
+        for spec in specs:
+            self._packers[spec] = spec
+            if isinstance(spec, CompiledSpec):
+                self._packers[spec.spec] = spec
+
+    def spec_for(self, text, offset=0):
+        """ The spec for the record starting at offset in text, or None if
+        the type code is not known """
+        start = offset + self._code_offset
+        code = bytes(text[start:start+self._code_width])
+        return self._specs.get(code, self._default)
+
+    ## unpack
+    def unpack(self, text_line):
+        return self.unpack_from(text_line)
+
+    def unpack_from(self, buffer, offset=0):
+        """ Unpack the record starting at offset in buffer with the spec
+        for its type code """
+        if six.PY3 and isinstance(buffer, str):
+            buffer = buffer.encode()
+        spec = self.spec_for(buffer, offset)
+        if spec is None:
+            return self._unknown(buffer, offset)
+        return spec.unpack_from(buffer, offset)
+
+    def _iter_unpack_block(self, block, stride):
+        start, end = self._code_offset, self._code_offset + self._code_width
+        specs = self._specs
+        default = self._default
+        for offset in range(0, len(block), stride):
+            spec = specs.get(block[offset+start:offset+end], default)
+            if spec is None:
+                yield self._unknown(block, offset)
+            else:
+                yield spec.unpack_from(block, offset)
+
+    def _unknown(self, buffer, offset):
+        text = bytes(buffer[offset:offset+self.width])
+        start = self._code_offset
+        code = text[start:start+self._code_width]
+        return UnconvertedValue(text, 'Unknown record type %r' % code)
+
+    def iter_file(self, fileobj, terminator=b"\n", chunk_size=None):
+        """ Iterate over the records of a file object. Records of different
+        widths may follow each other directly when terminator is None, in
+        which case a record with an unknown type code stops the iteration
+        with a ValueError since the start of the next record cannot be
+        found. """
+        if terminator:
+            return Spec.iter_file(self, fileobj, terminator, chunk_size)
+        return self._iter_unterminated(fileobj, chunk_size)
+
+    def _iter_unterminated(self, fileobj, chunk_size):
+        if chunk_size is None:
+            chunk_size = DEFAULT_CHUNK_SIZE
+        code_end = self._code_offset + self._code_width
+        data = b""
+        offset = 0
+        at_eof = False
+        while not at_eof:
+            chunk = fileobj.read(chunk_size)
+            if six.PY3 and isinstance(chunk, str):
+                chunk = chunk.encode()
+            at_eof = not chunk
+            data = data[offset:] + chunk
+            offset = 0
+            while offset < len(data):
+                if len(data) - offset < code_end and not at_eof:
+                    break
+                if at_eof and not data[offset:].strip():
+                    break
+                spec = self.spec_for(data, offset)
+                if spec is None:
+                    raise ValueError("Unknown record type at %r"
+                        % data[offset:offset+self.width])
+                if len(data) - offset < spec.width and not at_eof:
+                    break
+                yield spec.unpack(data[offset:offset+spec.width])
+                offset += spec.width
+
+    ## pack
+    def pack(self, rec):
+        """ Pack a record unpacked by one of the record type specs. The
+        result is as wide as that record type. """
+        spec = self._packers.get(getattr(rec, '_spec', None))
+        if spec is None:
+            raise TypeError("Record %r was not created by one of the "
+                "dispatched specs" % (rec,))
+        return spec.pack(rec)
+
+def _as_spec(spec):
+    if isinstance(spec, Spec):
+        return spec
+    from .mapping import Dict
+    return Dict(spec)
@@ -9,9 +9,17 @@ import struct
 import six
 import string
 
+try:
+    from collections.abc import MutableMapping as _MutableMapping
+except ImportError:
+    from collections import MutableMapping as _MutableMapping
+
 from .util import UnconvertedValue
-from .spec import Spec, atom_to_spec_map
-from .sequence import Array
+from .spec import Spec, SpecificationError, atom_to_spec_map
+from .sequence import (Array, BaseSequence, _assemble, _block_fields,
+                       _encoded, _pack_field, _pack_fields,
+                       _raw_columns, _setup_encoding, _setup_leaves,
+                       _slices_struct_fmt, _unpack_encoded)
 
 class _BaseDict(Spec):
     """ Abstract Base Class for Dict Types. Provided only for implementation
@@ -20,18 +28,38 @@ class _BaseDict(Spec):
     """
 
     _value_type = None
+    _encoding = None
+    _blank = b' '
 
-    def __init__(self, key_map=()):
+    def __init__(self, key_map=(), lazy=False, encoding=None):
         self._spec_map = atom_to_spec_map(key_map)
+        self._lazy = lazy
         self._unpack_funs = [s.unpack for n, s in self._spec_map]
         self._pack_funs = [s.pack for n, s in self._spec_map]
+        self._setup_field_slices()
         self._struct = struct.Struct(self._struct_fmt)
+        self._setup_leaves()
         self._setup_to_value_funs()
+        if encoding:
+            self._set_encoding(encoding)
 
     @property
     def width(self):
         """ The width of the dictionary record as text """
-        return sum(s.width for name, s in self._spec_map)
+        return self._width
+
+    def project(self, names):
+        """ A spec for the same record layout which only unpacks the named
+        fields. The struct skips over the other fields, so they are neither
+        sliced nor converted. Packing a value of the projection writes
+        blanks in place of the skipped fields. The fields keep their order
+        in the record, whatever the order of names, and a name given twice
+        is projected once. """
+        idxs = sorted(set(self._field_index[n] for n in names))
+        proj = type(self)([self._spec_map[i] for i in idxs], lazy=self._lazy,
+                          encoding=self._encoding)
+        proj._set_layout([self._field_slices[i] for i in idxs], self._width)
+        return proj
 
     ## unpack
     def unpack(self, text_line):
@@ -39,20 +67,115 @@ class _BaseDict(Spec):
         if six.PY3 and isinstance(text_line, str):
             text_line = text_line.encode()
 
-        # Turn bytes object into a list of bytes objects
+        if self._lazy:
+            return self.unpack_lazy(text_line)
+        return self.unpack_from(text_line)
+
+    def unpack_from(self, buffer, offset=0):
+        """ Convert the record starting at offset in buffer, which may be
+        any object supporting the buffer protocol (bytes, bytearray,
+        memoryview, mmap). Only the bytes of each field are copied out of
+        the buffer. """
+        if six.PY3 and isinstance(buffer, str):
+            buffer = buffer.encode()
+        size = self._struct.size
+        if self._lazy:
+            return self.unpack_lazy(buffer[offset:offset+size])
+        if self._encoding is not None:
+            return self._make_value(_unpack_encoded(self, buffer, offset))
+
+        # Turn the buffer into a list of bytes objects, one per leaf field
         try:
-            values = self._struct.unpack_from(text_line)
+            values = self._leaf_struct.unpack_from(buffer, offset)
         except struct.error:
             # pad the line out so that struct will take it
-            values = self._struct.unpack_from(text_line.ljust(self.width))
+            values = self._leaf_struct.unpack(
+                bytes(buffer[offset:offset+size]).ljust(size))
+        return self._make_value(values)
 
-        values = [s(v) for s, v in zip(self._unpack_funs, values)]
-        #print([v for _, v in self._to_value_funs])
+    def _make_value(self, values):
+        """ Convert the leaf field byte strings from the leaf struct into a
+        value """
+        if self._nested:
+            values = _assemble(self._leaf_funs, values)
+        else:
+            values = [s(v) for s, v in zip(self._unpack_funs, values)]
+        return self._value_type(list(zip(self._keys, values)), self)
 
-        #for idx, to_value in self._to_value_funs:
-        #    values[idx] = to_value(values[idx])
+    def compile(self):
+        """ A spec for the same records with generated unpack and pack
+        functions, which are much faster. See compiler.CompiledSpec """
+        from .compiler import CompiledSpec
+        return CompiledSpec(self)
 
-        return self._value_type(list(zip(self._keys, values)), self)
+    def to_arrow_schema(self):
+        """ The pyarrow schema for the records. Requires pyarrow """
+        from .arrow import to_arrow_schema
+        return to_arrow_schema(self)
+
+    def read_arrow(self, source, batch_size=None, terminator=b"\n"):
+        """ Iterate over pyarrow RecordBatches of the records in source.
+        See arrow.read_arrow """
+        from .arrow import read_arrow
+        return read_arrow(source, self, batch_size, terminator)
+
+    def unpack_columns(self, source, terminator=b"\n", engine='python'):
+        """ Decode all of the records in source, a file object or a
+        bytes-like object, into a dict holding a column of values for each
+        field. No value is created for the individual records. Integer
+        fields give an array.array, others a list.
+
+        With engine='numpy' the numeric fields are decoded with numpy. See
+        vectorized.unpack_arrays.
+        """
+        if engine == 'numpy':
+            from .vectorized import unpack_arrays
+            return unpack_arrays(source, self, terminator)
+        columns = _raw_columns(self, source, terminator)
+        return dict((name, spec.unpack_column(column))
+                    for (name, spec), column in zip(self._spec_map, columns))
+
+    def unpack_lazy(self, text_line):
+        """ Convert the given byte text into a mapping which only converts
+        a field when it is first read """
+        if six.PY3 and isinstance(text_line, str):
+            text_line = text_line.encode()
+        width = self._struct.size
+        text_line = bytes(text_line)
+        if len(text_line) != width:
+            text_line = text_line[:width].ljust(width)
+        return LazyDictValue(text_line, self)
+
+    def _iter_unpack_block(self, block, stride):
+        if self._lazy:
+            width = self._struct.size
+            for offset in range(0, len(block), stride):
+                yield LazyDictValue(block[offset:offset+width], self)
+            return
+        for values in _block_fields(self, block, stride, self._leaf_struct):
+            yield self._make_value(values)
+
+    def _setup_field_slices(self):
+        # Where each field is found in the record text
+        self._field_index = {}
+        self._field_slices = []
+        offset = 0
+        self._keys = [name for name, spec in self._spec_map]
+        for idx, (name, spec) in enumerate(self._spec_map):
+            self._field_index[name] = idx
+            self._field_slices.append((offset, offset + spec.width))
+            offset += spec.width
+        self._width = offset
+        self._contiguous = True
+
+    def _set_layout(self, field_slices, width):
+        """ Place the fields at the given slices of a record of width
+        bytes. Bytes outside of the slices are skipped when unpacking. """
+        self._field_slices = field_slices
+        self._width = width
+        self._contiguous = False
+        self._struct = struct.Struct(self._struct_fmt)
+        self._setup_leaves()
 
     def _setup_to_value_funs(self):
         # Functions to call when we convert from a string to a value
@@ -69,18 +192,89 @@ class _BaseDict(Spec):
             err = "Specification requires value to have a %r key" % e.args
             raise KeyError(err)
 
-        return b''.join(s(v) for s, v in zip(self._pack_funs, value))
+        if not self._contiguous:
+            buf = bytearray(self._blank * self._width)
+            self.pack_into(buf, 0, rec)
+            return bytes(buf)
+        return b''.join(_pack_fields(self, value))
 
-    ## Private
-    @property
-    def _keys(self):
-        return [name for name, f in self._spec_map]
+    def pack_into(self, buffer, offset, rec):
+        """ Pack the record straight into a writable buffer at offset """
+        try:
+            value = [rec[n] for n, s in self._spec_map]
+        except KeyError as e:
+            err = "Specification requires value to have a %r key" % e.args
+            raise KeyError(err)
+        packed = _pack_fields(self, value)
+        if self._contiguous:
+            self._struct.pack_into(buffer, offset, *packed)
+            return
+        # Only write the fields, leaving the skipped bytes alone
+        for (start, end), text in zip(self._field_slices, packed):
+            buffer[offset+start:offset+end] = text
 
+    def pack_field_into(self, buffer, offset, field, value):
+        """ Pack value into a single field of the record at offset in a
+        writable buffer, leaving the rest of the record untouched. Nested
+        fields are given as a path of names and indexes, such as
+        ('items', 2, 'total').
+        """
+        if isinstance(field, (list, tuple)):
+            field, path = field[0], field[1:]
+        else:
+            path = ()
+        idx = self._field_index[field]
+        start, end = self._field_slices[idx]
+        if path:
+            spec = self._spec_map[idx][1]
+            spec.pack_field_into(buffer, offset + start, path, value)
+        else:
+            buffer[offset+start:offset+end] = _pack_field(self, idx, value)
+
+    ## Private
     @property
     def _struct_fmt(self):
-        return ''.join('%ds' % f.width for name, f in self._spec_map)
+        return _slices_struct_fmt(self._field_slices, self._width)
+
+    def _setup_leaves(self):
+        _setup_leaves(self, [s for n, s in self._spec_map])
+
+    def _set_encoding(self, encoding):
+        """ Read and write the records in a single byte encoding """
+        if self._lazy:
+            raise SpecificationError("Lazy specs cannot have an encoding")
+        self._encoding = encoding
+        self._spec_map = [(n, _encoded(s, encoding))
+                          for n, s in self._spec_map]
+        self._unpack_funs = [s.unpack for n, s in self._spec_map]
+        self._pack_funs = [s.pack for n, s in self._spec_map]
+        self._setup_leaves()
+        self._setup_to_value_funs()
+        self._setup_encoding()
+
+    def _setup_encoding(self):
+        _setup_encoding(self, [s for n, s in self._spec_map])
+
+    ## pickle protocol. Struct objects and the encoding functions cannot be
+    ## pickled
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_struct']
+        del state['_leaf_struct']
+        state.pop('_field_decoders', None)
+        state.pop('_field_encoders', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._struct = struct.Struct(self._struct_fmt)
+        self._setup_leaves()
+        if self._encoding is not None:
+            self._setup_encoding()
 
 class _UnconvertedMappingValueMixIn(object):
+    __slots__ = ()
+
     def has_unconverted(self):
         return any(isinstance(s, UnconvertedValue) for s in list(self.values()))
 
@@ -107,6 +301,9 @@ class DictValue(dict, _UnconvertedMappingValueMixIn):
         rec = type(self)(self, self._spec)
         return rec
 
+    def __reduce__(self):
+        return (type(self), (dict(self), self._spec))
+
     ## dict protocol
     def __setitem__(self, key, str_value):
         if not isinstance(str_value, basestring):
@@ -129,6 +326,83 @@ class DictValue(dict, _UnconvertedMappingValueMixIn):
     def pack(self):
         return self._spec.pack(self)
 
+class LazyDictValue(_MutableMapping, _UnconvertedMappingValueMixIn):
+    """ The value of a lazy Dict. The record text is kept and each field is
+    converted the first time it is read. pack() copies the text of fields
+    which were not assigned to straight from the original record.
+    """
+    def __init__(self, raw, spec):
+        self._raw = raw
+        self._spec = spec
+        self._values = {}
+        self._assigned = set()
+
+    def __copy__(self):
+        rec = type(self)(self._raw, self._spec)
+        rec._values = dict(self._values)
+        rec._assigned = set(self._assigned)
+        return rec
+
+    def __deepcopy__(self, memo):
+        rec = type(self)(self._raw, self._spec)
+        rec._values = copy.deepcopy(self._values, memo)
+        rec._assigned = set(self._assigned)
+        return rec
+
+    ## dict protocol
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        idx = self._spec._field_index[key]
+        start, end = self._spec._field_slices[idx]
+        value = self._spec._unpack_funs[idx](self._raw[start:end])
+        self._values[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self._values[key] = value
+        self._assigned.add(key)
+
+    def __delitem__(self, key):
+        raise TypeError("values cannot be removed from stype dicts")
+
+    def clear(self):
+        raise TypeError("values cannot be removed from stype dicts")
+
+    def __iter__(self):
+        for name, _ in self._spec._spec_map:
+            yield name
+        for key in self._values:
+            if key not in self._spec._field_index:
+                yield key
+
+    def __len__(self):
+        return len(self._spec._spec_map) + len(
+            [k for k in self._values if k not in self._spec._field_index])
+
+    def __contains__(self, key):
+        return key in self._spec._field_index or key in self._values
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def pack(self):
+        spec = self._spec
+        buf = None
+        for idx, (name, field_spec) in enumerate(spec._spec_map):
+            if name in self._assigned or (name in self._values and
+                    isinstance(field_spec, (_BaseDict, BaseSequence))):
+                # Nested values can change without being assigned
+                if buf is None:
+                    buf = bytearray(self._raw)
+                start, end = spec._field_slices[idx]
+                buf[start:end] = spec._pack_funs[idx](self._values[name])
+        if buf is None:
+            return self._raw
+        return bytes(buf)
+
 class Dict(_BaseDict):
     _value_type = DictValue
 
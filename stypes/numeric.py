@@ -3,6 +3,8 @@ from future import standard_library
 standard_library.install_aliases()
 from builtins import str
 from builtins import object
+import array
+import binascii
 import decimal
 import io
 import re
@@ -26,6 +28,14 @@ class Integer(Spec):
         except ValueError:
             return UnconvertedValue(text, 'expecting all digits for integer')
 
+    def unpack_column(self, values):
+        """ An array of the integers. A list is given instead when some of
+        the values are blank or could not be converted """
+        try:
+            return array.array('q', map(int, values))
+        except (ValueError, OverflowError):
+            return Spec.unpack_column(self, values)
+
     def to_bytes(self, value):
         if value is None:
             text = b''
@@ -47,23 +57,96 @@ class Numeric(Spec):
         999V99
         999.99
         999,999.99
+
+    Values are Decimals by default. as_='float' gives floats and
+    as_='int_scaled' gives the integer count of the units of the last digit
+    of the picture, so 123.45 with 999V99 is 12345. to_bytes takes values
+    of the same type.
+
+    zoned='trailing' (or True) and zoned='leading' read signed zoned
+    decimal, where the sign is overpunched on the last or first digit
+    instead of taking a byte of its own. The picture still needs its S.
+    S9(3)V99 with zoned=True reads 0012J as -1.21.
     """
 
     width = property(lambda s: s._width)
 
-    def __init__(self, fspec):
+    _result_types = ('decimal', 'int_scaled', 'float')
+
+    def __init__(self, fspec, as_='decimal', zoned=False):
+        if as_ not in self._result_types:
+            raise ValueError("as_ must be one of %s, not %r"
+                             % (', '.join(self._result_types), as_))
+        if zoned is True:
+            zoned = 'trailing'
+        if zoned not in (False, None, 'trailing', 'leading'):
+            raise ValueError("zoned must be 'trailing' or 'leading', not %r"
+                             % (zoned,))
+        self._as = as_
+        self._zoned = zoned or None
         self._fspec = fspec
         self._converters = []
         self._build_convert_procs()
+        if self._zoned:
+            self._overpunch_digit()
         self._compute_precision()
         self._width = sum(c.width for c in self._converters)
+        self._compile_picture()
+        self._compile_encoder()
 
     def from_bytes(self, text):
         if not text.strip():
             return None
+        if self._punct_mask is not None:
+            if len(text) != self._width:
+                text = text.rjust(self._width)
+            if text.translate(_DIGIT_MASK) == self._punct_mask:
+                digits = text.translate(_SPACE_ZERO, self._punct_delete)
+                if self._as == 'decimal':
+                    return decimal.Decimal(digits.decode())
+                elif self._as == 'float':
+                    return float(digits)
+                return int(digits)
         text = text.decode()
         if len(text) != self._width:
             text = text.rjust(self._width)
+        if self._fast_re is not None:
+            match = self._fast_re.match(text)
+            if match is not None:
+                groups = match.groups()
+                digits = ''.join([groups[i] for i in self._fast_digits])
+                if self._zoned:
+                    digits = digits.translate(_OVERPUNCH_DIGITS)
+                digits = digits.replace(' ', '0')
+                if self._as == 'int_scaled':
+                    v = int(digits)
+                else:
+                    if self._fast_point is not None:
+                        digits = digits[:self._fast_point] + '.' + \
+                                 digits[self._fast_point:]
+                    if self._as == 'float':
+                        v = float(digits)
+                    else:
+                        v = decimal.Decimal(digits)
+                if self._fast_sign is not None and \
+                        groups[self._fast_sign] in self._fast_negative:
+                    return -v
+                return v
+        v = self._convert(text)
+        if self._as == 'decimal' or isinstance(v, UnconvertedValue):
+            return v
+        return self._from_decimal(v)
+
+    def _from_decimal(self, value):
+        """ Convert a Decimal into the result type """
+        if self._as == 'int_scaled':
+            return int(value.scaleb(self._scale))
+        elif self._as == 'float':
+            return float(value)
+        return value
+
+    def _convert(self, text):
+        """ Run the text through the converters of the picture """
         text_input = StringIO(text)
         decimal_input = ConvertState()
         for converter in self._converters:
@@ -79,7 +162,39 @@ class Numeric(Spec):
     def to_bytes(self, value):
         if value is None:
             return b' '*self._width
-        text = self._precision_fmt % abs(value)
+        if self._as == 'int_scaled':
+            if self._enc_template is not None:
+                # The digits of the scaled value are the digits of the text
+                text = digits = '%d' % abs(value)
+            else:
+                text = self._precision_fmt % abs(
+                    decimal.Decimal(value).scaleb(-self._scale))
+                digits = None
+        else:
+            text = self._precision_fmt % abs(value)
+            digits = text.replace('.', '')
+        if self._enc_template is not None:
+            if digits.isdigit():
+                ndigits = self._digits
+                if len(digits) > ndigits:
+                    # Overflow drops the high digits, like the converters
+                    digits = digits[-ndigits:]
+                else:
+                    digits = digits.zfill(ndigits)
+                sign = '-' if value < 0 else ' '
+                if self._zoned:
+                    idx = 0 if self._zoned == 'leading' else ndigits - 1
+                    digits = digits[:idx] + \
+                        _OVERPUNCH[value < 0][int(digits[idx])] + \
+                        digits[idx+1:]
+                return (self._enc_template % tuple([
+                    sign if part is None else digits[part[0]:part[1]]
+                    for part in self._enc_parts])).encode()
+        return self._write_text(value, text)
+
+    def _write_text(self, value, text):
+        """ Run the formatted value through the converters of the picture
+        """
         buf = ConvertState(text[::-1])
         if value < 0:
             buf.positive = False
@@ -106,7 +221,142 @@ class Numeric(Spec):
             # add all the numbers past it
             elif adding:
                 prec += c.width
+        self._precision = prec
+        # The number of digits after the decimal point
+        self._scale = 0
+        point = False
+        for c in self._converters:
+            if isinstance(c, (VConverter, DECIMALConverter)):
+                point = True
+            elif point and isinstance(c, (NINEConverter,
+                                          OVERPUNCHConverter)):
+                self._scale += c.width
         self._precision_fmt = "%." + str(prec) + "f"
+        self._digits = sum(c.width for c in self._converters
+                           if isinstance(c, (NINEConverter,
+                                             OVERPUNCHConverter)))
+
+    def _compile_picture(self):
+        """ Compile the picture into a regular expression which matches the
+        text of every valid value, with a group for the sign and for each
+        run of digits. Text which does not match is left to the converters,
+        which give the error. Pictures with more than one decimal point are
+        always left to the converters.
+
+        Pictures made only of digits, commas and at most one decimal point,
+        such as 999,999.99, also get a mask of their bytes. Text with the
+        same mask once its digits and spaces are masked holds a valid value
+        whose digits are found with a translate, without the regex. """
+        self._fast_re = None
+        self._punct_mask = None
+        pattern = []
+        digit_groups = []
+        ngroups = 0
+        point = None
+        sign = None
+        ndigits = 0
+        self._fast_negative = '-'
+        for c in self._converters:
+            if isinstance(c, NINEConverter):
+                digit_groups.append(ngroups)
+                ngroups += 1
+                pattern.append('([ 0-9]{%d})' % c.width)
+                ndigits += c.width
+            elif isinstance(c, OVERPUNCHConverter):
+                # The group is both a digit and the sign
+                sign = ngroups
+                digit_groups.append(ngroups)
+                ngroups += 1
+                pattern.append(r'([ 0-9{}A-R])')
+                self._fast_negative = _OVERPUNCH[True]
+                ndigits += 1
+            elif isinstance(c, (DECIMALConverter, VConverter)):
+                if point is not None:
+                    return
+                point = ndigits
+                if isinstance(c, DECIMALConverter):
+                    pattern.append(r'\.')
+            elif isinstance(c, COMMAConverter):
+                pattern.append(',')
+            elif isinstance(c, SIGNConverter):
+                sign = ngroups
+                ngroups += 1
+                pattern.append('(.)')
+            elif isinstance(c, SPACEConverter):
+                pattern.append('.')
+            else:
+                return
+        if not digit_groups:
+            return
+        self._fast_re = re.compile(''.join(pattern), re.DOTALL)
+        self._fast_digits = digit_groups
+        self._fast_point = point
+        self._fast_sign = sign
+        if ',' in pattern and all(isinstance(c, (NINEConverter, COMMAConverter,
+                                                 DECIMALConverter))
+                                  for c in self._converters):
+            self._punct_mask = b''.join(
+                b'9' * c.width if isinstance(c, NINEConverter) else
+                repr(c).encode() for c in self._converters)
+            # int_scaled values are the digits without the point
+            self._punct_delete = b',.' if self._as == 'int_scaled' else b','
+
+    def _compile_encoder(self):
+        """ Compile the picture into a format string with a %s for the sign
+        and each run of digits, and the slice of the zero padded digits of
+        the value for each run. Pictures with more than one decimal point or
+        with punctuation in the fraction are left to the converters. """
+        self._enc_template = None
+        template = []
+        parts = []
+        ndigits = 0
+        points = 0
+        for c in self._converters:
+            if isinstance(c, (NINEConverter, OVERPUNCHConverter)):
+                template.append('%s')
+                parts.append((ndigits, ndigits + c.width))
+                ndigits += c.width
+            elif isinstance(c, (DECIMALConverter, VConverter)):
+                points += 1
+                if isinstance(c, DECIMALConverter):
+                    template.append('.')
+            elif isinstance(c, SIGNConverter):
+                template.append('%s')
+                parts.append(None)
+            elif points:
+                return
+            elif isinstance(c, COMMAConverter):
+                template.append(',')
+            elif isinstance(c, SPACEConverter):
+                template.append(' ')
+            else:
+                return
+        if points > 1 or (points and not self._precision) or not ndigits:
+            return
+        self._enc_template = ''.join(template)
+        self._enc_parts = parts
+
+    def _overpunch_digit(self):
+        """ Replace the sign of the picture with an overpunch of the last or
+        first digit """
+        signs = [c for c in self._converters if isinstance(c, SIGNConverter)]
+        if not signs:
+            raise NumericFormatError("A zoned picture needs an S")
+        self._converters.remove(signs[0])
+        nines = [i for i, c in enumerate(self._converters)
+                 if isinstance(c, NINEConverter)]
+        if not nines:
+            raise NumericFormatError("A zoned picture needs digits")
+        idx = nines[0] if self._zoned == 'leading' else nines[-1]
+        count = self._converters[idx].width
+        if count == 1:
+            self._converters[idx:idx+1] = [OVERPUNCHConverter()]
+        elif self._zoned == 'leading':
+            self._converters[idx:idx+1] = [OVERPUNCHConverter(),
+                                           NINEConverter(count - 1)]
+        else:
+            self._converters[idx:idx+1] = [NINEConverter(count - 1),
+                                           OVERPUNCHConverter()]
 
     def _build_convert_procs(self):
         nine_count = 0
@@ -190,6 +440,124 @@ class Numeric(Spec):
         elif state == 'LPAREN':
             raise NumericFormatError("Unexpected end of input. expected )")
 
+class _MachineNumber(Spec):
+    """ Base for numbers stored in binary forms, given with a picture of S,
+    9 and V. The bytes are not text, so they are never stripped. Files
+    holding these fields should be read without a terminator, since the
+    terminator byte can turn up inside a field. """
+
+    _result_types = Numeric._result_types
+
+    def __init__(self, fspec, as_='decimal'):
+        if as_ not in self._result_types:
+            raise ValueError("as_ must be one of %s, not %r"
+                             % (', '.join(self._result_types), as_))
+        picture = Numeric(fspec)
+        for c in picture._converters:
+            if not isinstance(c, (NINEConverter, VConverter, SIGNConverter)):
+                raise NumericFormatError("Only S, 9 and V can be used in a "
+                    "%s picture, found %r" % (type(self).__name__, c))
+        if not picture._digits:
+            raise NumericFormatError("No digits in picture %r" % fspec)
+        self._fspec = fspec
+        self._as = as_
+        self._signed = any(isinstance(c, SIGNConverter)
+                           for c in picture._converters)
+        self._digits = picture._digits
+        self._scale = self._precision = picture._scale
+
+    def unpack(self, s):
+        return self.from_bytes(bytes(s))
+
+    def unpack_column(self, values):
+        from_bytes = self.from_bytes
+        return [from_bytes(s) for s in values]
+
+    def _result(self, n):
+        """ The value of the scaled integer n as the result type """
+        if self._as == 'int_scaled':
+            return n
+        elif self._as == 'float':
+            return n / 10.0 ** self._scale
+        return decimal.Decimal(n).scaleb(-self._scale)
+
+    def _scaled(self, value):
+        """ The scaled integer of a value of the result type, with the high
+        digits that do not fit the picture dropped """
+        if value is None:
+            return 0
+        if self._as == 'int_scaled':
+            n = int(value)
+        else:
+            n = int(decimal.Decimal(value).scaleb(self._scale)
+                    .to_integral_value())
+        mod = 10 ** self._digits
+        return n % mod if n >= 0 else -(-n % mod)
+
+class Packed(_MachineNumber):
+    """ Packed decimal (COMP-3). Two digits per byte with the sign in the
+    low nibble of the last byte: C or F for positive and D for negative.
+
+    Packed('S9(7)V99') is 5 bytes wide. None is packed as zero.
+    """
+    _negative_nibbles = 'db'
+    _sign_nibbles = 'abcdef'
+
+    def __init__(self, fspec, as_='decimal'):
+        _MachineNumber.__init__(self, fspec, as_)
+        self.width = self._digits // 2 + 1
+        self._nibbles = self.width * 2 - 1
+
+    def from_bytes(self, text):
+        nibbles = binascii.hexlify(text).decode()
+        digits, sign = nibbles[:-1], nibbles[-1:]
+        if not digits.isdigit() or sign not in self._sign_nibbles or \
+                len(text) != self.width:
+            return UnconvertedValue(text, 'Expected packed decimal digits '
+                                    'and a sign')
+        n = int(digits)
+        if sign in self._negative_nibbles:
+            n = -n
+        return self._result(n)
+
+    def to_bytes(self, value):
+        n = self._scaled(value)
+        if not self._signed:
+            sign = 'f'
+        elif n < 0:
+            sign = 'd'
+        else:
+            sign = 'c'
+        return binascii.unhexlify('%0*d%s' % (self._nibbles, abs(n), sign))
+
+class Binary(_MachineNumber):
+    """ Binary integer (COMP). The width is 2, 4 or 8 bytes for up to 4, 9
+    and 18 digits. The number is signed when the picture has an S.
+
+    Binary('S9(9)', endian='big') is 4 bytes wide. None is packed as zero.
+    """
+    def __init__(self, fspec, endian='big', as_='decimal'):
+        _MachineNumber.__init__(self, fspec, as_)
+        if endian not in ('big', 'little'):
+            raise ValueError("endian must be 'big' or 'little', not %r"
+                             % (endian,))
+        if self._digits > 18:
+            raise NumericFormatError("Binary fields hold up to 18 digits")
+        self._endian = endian
+        self.width = 2 if self._digits <= 4 else 4 if self._digits <= 9 else 8
+
+    def from_bytes(self, text):
+        if len(text) != self.width:
+            return UnconvertedValue(text, 'Expected %d bytes' % self.width)
+        return self._result(int.from_bytes(text, self._endian,
+                                           signed=self._signed))
+
+    def to_bytes(self, value):
+        n = self._scaled(value)
+        if not self._signed:
+            n = abs(n)
+        return n.to_bytes(self.width, self._endian, signed=self._signed)
+
 class ConvertState(object):
     """ We need a stateful object to keep track of whether the number is
     positive or negative. If we could, we we've just added an attribute to the
@@ -285,6 +653,43 @@ class SPACEConverter(object):
     def write_output_text(self, inp, outp):
         outp.write(" ")
 
+# The mask of numeric text, with its digits and spaces made 9s
+_DIGIT_MASK = bytes.maketrans(b' 0123456789', b'9' * 11)
+_SPACE_ZERO = bytes.maketrans(b' ', b'0')
+
+# The overpunched characters for 0-9, positive and negative
+_OVERPUNCH = {False: '{ABCDEFGHI', True: '}JKLMNOPQR'}
+_OVERPUNCH_DIGITS = dict((ord(c), ord(str(i % 10)))
+                         for i, c in enumerate('{ABCDEFGHI}JKLMNOPQR'))
+_OVERPUNCH_SIGNS = dict((c, (str(i % 10), i < 10))
+                        for i, c in enumerate('{ABCDEFGHI}JKLMNOPQR'))
+
+class OVERPUNCHConverter(object):
+    """ A digit with the sign of the number overpunched on it """
+    width = property(lambda s: 1)
+
+    def __repr__(self):
+        return "9S"
+
+    def write_decimal_input(self, inp, outp):
+        v = inp.read(1)
+        try:
+            digit, outp.positive = _OVERPUNCH_SIGNS[v]
+        except KeyError:
+            if v == ' ':
+                digit = '0'
+            elif len(v) == 1 and v in '0123456789':
+                digit = v
+            else:
+                return "Expected a digit or overpunched sign. Found %r" % v
+        outp.write(digit)
+
+    def write_output_text(self, inp, outp):
+        v = inp.read(1) or '0'
+        if v not in '0123456789':
+            return "Found non numeric data %r in value" % v
+        outp.write(_OVERPUNCH[not inp.positive][int(v)])
+
 class NINEConverter(object):
     width = property(lambda s: s._count)
 
@@ -24,6 +24,9 @@ class OrderedDictValue(_OrderedDict, _UnconvertedMappingValueMixIn):
         rec = OrderedDictValue(self, self._spec)
         return rec
 
+    def __reduce__(self):
+        return (type(self), (list(self.items()), self._spec))
+
     def update(self, other):
         for key, value in list(other.items()):
             self.__setitem__(key, value)
@@ -0,0 +1,121 @@
+""" Decoding large files of fixed-width records on several processes.
+
+The file is split into chunks on record boundaries and each chunk is read
+and decoded by a worker process. Workers only receive the path and byte
+range of their chunk, so the raw data never crosses a process boundary.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from io import BytesIO
+import os
+
+from .spec import Spec
+from .stream import iter_unpack
+
+__all__ = ['parallel_unpack', 'parallel_map']
+
+DEFAULT_CHUNK_RECORDS = 65536
+
+def parallel_unpack(path, spec, workers=None, chunk_records=None,
+                    terminator=b"\n", ordered=True):
+    """ Iterate over the records of the file at path, decoding chunks of
+    chunk_records records on workers processes. Records are given in file
+    order unless ordered is False, in which case the records of each chunk
+    are given as soon as that chunk is done. """
+    chunks = parallel_map(path, spec, list, workers, chunk_records,
+                          terminator, ordered)
+    for recs in chunks:
+        for rec in recs:
+            yield rec
+
+def parallel_map(path, spec, func, workers=None, chunk_records=None,
+                 terminator=b"\n", ordered=True):
+    """ Call func in a worker process with an iterator over the records of
+    each chunk of the file at path and iterate over the return values.
+    func must be picklable, so it has to be defined at module level.
+
+    Only the value func returns is sent back from the worker, so reducing
+    records in func avoids sending them between processes:
+
+    total = sum(parallel_map(path, spec, sum_amounts))
+    """
+    if not isinstance(spec, Spec):
+        from .mapping import Dict
+        spec = Dict(spec)
+    if chunk_records is None:
+        chunk_records = DEFAULT_CHUNK_RECORDS
+    if workers is None:
+        workers = os.cpu_count() or 1
+    terminator = terminator or b""
+    chunk_size = chunk_records * (spec.width + len(terminator))
+    ranges = _chunk_ranges(os.path.getsize(path), chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit(start, stop):
+            return executor.submit(_map_chunk, path, spec, func, start, stop,
+                                   terminator)
+
+        # Limit the chunks in flight so results do not pile up in memory
+        pending = deque()
+        for start, stop in ranges:
+            pending.append(submit(start, stop))
+            if len(pending) >= workers * 2:
+                for result in _collect(pending, ordered):
+                    yield result
+        while pending:
+            for result in _collect(pending, ordered):
+                yield result
+
+def _collect(pending, ordered):
+    """ Remove the next finished futures from pending and return their
+    results """
+    if ordered:
+        return [pending.popleft().result()]
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.remove(future)
+    return [future.result() for future in done]
+
+def _chunk_ranges(size, chunk_size):
+    return [(start, min(start + chunk_size, size))
+            for start in range(0, size, chunk_size)]
+
+def _map_chunk(path, spec, func, start, stop, terminator):
+    data = _read_records(path, start, stop, terminator)
+    return func(iter_unpack(BytesIO(data), spec, terminator))
+
+def _read_records(path, start, stop, terminator):
+    """ Read the records which start in the byte range [start, stop) of
+    the file. The range does not have to fall on record boundaries when
+    the records are terminated: the record running over start belongs to
+    the previous range and the record running over stop is read to its
+    end. """
+    with open(path, 'rb') as fd:
+        if not terminator:
+            fd.seek(start)
+            return fd.read(stop - start)
+
+        # A record starts at start if the terminator ends right before it
+        begin = max(start - len(terminator), 0)
+        fd.seek(begin)
+        data = fd.read(stop - begin)
+        if start:
+            idx = data.find(terminator)
+            if idx == -1:
+                return b""
+            data = data[idx + len(terminator):]
+            if not data:
+                return b""
+
+        while not data.endswith(terminator):
+            more = fd.read(len(terminator) + 4096)
+            if not more:
+                break
+            # The terminator may be split between data and more
+            overlap = len(terminator) - 1
+            idx = (data[len(data)-overlap:] + more).find(terminator)
+            if idx == -1:
+                data += more
+            else:
+                data += more[:idx - overlap + len(terminator)]
+        return data
@@ -0,0 +1,118 @@
+""" Compact record values. Each Record spec generates a value class with a
+slot for every field, so a record holds no dict of its own. Keeping
+millions of records in memory takes much less room than with Dict.
+"""
+import keyword
+import re
+
+from .mapping import _BaseDict, _MutableMapping, _UnconvertedMappingValueMixIn
+from .spec import SpecificationError
+
+__all__ = ['Record']
+
+_FIELD_NAME = re.compile(r'^[A-Za-z][A-Za-z0-9_]*$')
+
+class RecordValue(_MutableMapping, _UnconvertedMappingValueMixIn):
+    """ Base of the value classes of Record specs. The fields are read as
+    attributes or items, rec.name or rec['name']. """
+    __slots__ = ()
+    _spec = None
+    _fields = ()
+
+    def __init__(self, values, spec=None):
+        if hasattr(values, 'items'):
+            values = values.items()
+        for name, value in values:
+            self[name] = value
+
+    def __copy__(self):
+        return type(self)(self.items())
+
+    def __deepcopy__(self, memo):
+        return type(self)(self.items())
+
+    def __reduce__(self):
+        return (_record_value, (self._spec, tuple(self.values())))
+
+    ## dict protocol
+    def __getitem__(self, key):
+        if key not in self._field_set:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self._field_set:
+            raise KeyError("Record has no %r field" % (key,))
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        raise TypeError("values cannot be removed from stype records")
+
+    def clear(self):
+        raise TypeError("values cannot be removed from stype records")
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, key):
+        return key in self._field_set
+
+    def __repr__(self):
+        return repr(self._asdict())
+
+    def _asdict(self):
+        return dict((name, getattr(self, name)) for name in self._fields)
+
+    def pack(self):
+        return self._spec.pack(self)
+
+def _record_value(spec, values):
+    return spec._value_type(zip(spec._keys, values))
+
+class Record(_BaseDict):
+    """ A Dict spec giving compact values with a slot for each field.
+
+    spec = Record([('name', 20), ('age', Integer(3))])
+    rec = spec.unpack(line)
+    rec.name, rec['age'], rec.pack(), rec._asdict()
+
+    Field names must be valid identifiers which do not start with an
+    underscore or clash with the methods of the values. Records can not
+    be lazy and no fields can be added to them.
+    """
+    def __init__(self, key_map=(), lazy=False, encoding=None):
+        if lazy:
+            raise SpecificationError("Records cannot be lazy")
+        _BaseDict.__init__(self, key_map, encoding=encoding)
+        self._setup_types()
+
+    def _setup_types(self):
+        for name in self._keys:
+            if not _FIELD_NAME.match(name) or keyword.iskeyword(name) or \
+                    hasattr(RecordValue, name):
+                raise SpecificationError("%r cannot be the name of a Record "
+                                         "field" % (name,))
+        self._value_type = type('RecordValue', (RecordValue,), {
+            '__slots__': tuple(self._keys),
+            '_spec': self,
+            '_fields': tuple(self._keys),
+            '_field_set': frozenset(self._keys)})
+
+    def _set_encoding(self, encoding):
+        _BaseDict._set_encoding(self, encoding)
+        # The value type of a copy has to refer to the copy
+        self._setup_types()
+
+    ## The value type is created on the fly so it is rebuilt rather than
+    ## pickled
+    def __getstate__(self):
+        state = _BaseDict.__getstate__(self)
+        del state['_value_type']
+        return state
+
+    def __setstate__(self, state):
+        _BaseDict.__setstate__(self, state)
+        self._setup_types()
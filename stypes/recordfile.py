@@ -0,0 +1,91 @@
+""" Random access to the records of a fixed-width file.
+
+The file is memory mapped and record offsets are computed from the width of
+the spec, so looking up a record never scans the file and only the pages
+holding the record are read from disk.
+"""
+import mmap
+import os
+
+from .spec import Spec
+from .util import LRUCache
+
+__all__ = ['RecordFile']
+
+_MISSING = object()
+
+class RecordFile(object):
+    """ A read-only sequence of the records stored in a file.
+
+    rf = RecordFile("master.txt", spec)
+    len(rf), rf[0], rf[-1], rf[100:200], reversed(rf)
+
+    Recently decoded records are kept in a cache of cache_size entries.
+    The cached records are shared between lookups, so copy a record before
+    changing it.
+    """
+    def __init__(self, path, spec, terminator=b"\n", cache_size=128):
+        if not isinstance(spec, Spec):
+            from .mapping import Dict
+            spec = Dict(spec)
+        self._spec = spec
+        self._width = spec.width
+        self._stride = self._width + len(terminator or b"")
+        self._cache = LRUCache(cache_size)
+        self._fd = open(path, 'rb')
+        size = os.fstat(self._fd.fileno()).st_size
+        if size:
+            self._mmap = mmap.mmap(self._fd.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        else:
+            # mmap refuses to map empty files
+            self._mmap = b""
+        count, extra = divmod(size, self._stride)
+        if extra:
+            # The last record was not terminated
+            count += 1
+        self._count = count
+
+    @property
+    def spec(self):
+        return self._spec
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('record index out of range')
+        return self._record(index)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._record(index)
+
+    def __reversed__(self):
+        for index in range(self._count - 1, -1, -1):
+            yield self._record(index)
+
+    def _record(self, index):
+        rec = self._cache.get(index, _MISSING)
+        if rec is _MISSING:
+            rec = self._spec.unpack_from(self._mmap, index * self._stride)
+            self._cache[index] = rec
+        return rec
+
+    ## File protocol
+    def close(self):
+        self._cache.clear()
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._fd.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -9,40 +9,98 @@ import six
 import string
 import struct
 
+from .codepage import raw_decoder, text_encoder, to_utf8, translation_tables
 from .spec import Spec, atom_to_spec_seq, atom_to_spec_map
+from .stream import iter_blocks
 from .util import UnconvertedValue
 
 class BaseSequence(Spec):
     _itype = None
     _str_itype = None
+    _encoding = None
+    _blank = b' '
 
-    def __init__(self, pos_specs=()):
+    def __init__(self, pos_specs=(), encoding=None):
         self._pos_specs = atom_to_spec_seq(pos_specs)
         self._setup_to_str_funs()
         self._setup_to_bytes_funs()
         self._unpack_funs = [p.unpack for p in self._pos_specs]
         self._pack_funs = [p.pack for p in self._pos_specs]
+        self._setup_field_slices()
         self._struct = struct.Struct(self._struct_fmt)
+        self._setup_leaves()
+        if encoding:
+            self._set_encoding(encoding)
 
     @property
     def width(self):
-        return sum(s.width for s in self._pos_specs)
+        return self._width
 
     ## unpack
     def unpack(self, text_line):
-        if six.PY3 and isinstance(text_line, str):
-            text_line = text_line.encode()
-        assert isinstance(text_line, bytes)
+        return self.unpack_from(text_line)
+
+    def unpack_from(self, buffer, offset=0):
+        """ Convert the record starting at offset in buffer, which may be
+        any object supporting the buffer protocol. Only the bytes of each
+        field are copied out of the buffer. """
+        if six.PY3 and isinstance(buffer, str):
+            buffer = buffer.encode()
+        if self._encoding is not None:
+            return self._make_value(_unpack_encoded(self, buffer, offset))
         try:
-            values = self._struct.unpack_from(text_line)
+            values = self._leaf_struct.unpack_from(buffer, offset)
         except struct.error:
             # pad the line out so that struct will take it
-            values = self._struct.unpack_from(text_line.ljust(self.width))
-        values = [s(v) for s, v in zip(self._unpack_funs, values)]
-        #for idx, from_str in self._to_str_funs:
-        #    values[idx] = from_str(values[idx])
+            size = self._leaf_struct.size
+            values = self._leaf_struct.unpack(
+                bytes(buffer[offset:offset+size]).ljust(size))
+        return self._make_value(values)
+
+    def _make_value(self, values):
+        """ Convert the leaf field byte strings from the leaf struct into a
+        value """
+        if self._nested:
+            values = _assemble(self._leaf_funs, values)
+        else:
+            values = [s(v) for s, v in zip(self._unpack_funs, values)]
         return self._itype(values, self)
 
+    def compile(self):
+        """ A spec for the same records with generated unpack and pack
+        functions, which are much faster. See compiler.CompiledSpec """
+        from .compiler import CompiledSpec
+        return CompiledSpec(self)
+
+    def to_arrow_schema(self):
+        """ The pyarrow schema for the records. Requires pyarrow """
+        from .arrow import to_arrow_schema
+        return to_arrow_schema(self)
+
+    def read_arrow(self, source, batch_size=None, terminator=b"\n"):
+        """ Iterate over pyarrow RecordBatches of the records in source.
+        See arrow.read_arrow """
+        from .arrow import read_arrow
+        return read_arrow(source, self, batch_size, terminator)
+
+    def unpack_columns(self, source, terminator=b"\n", engine='python'):
+        """ Decode all of the records in source, a file object or a
+        bytes-like object, into a list with a column of values for each
+        element. No value is created for the individual records.
+
+        With engine='numpy' the numeric fields are decoded with numpy. See
+        vectorized.unpack_arrays.
+        """
+        if engine == 'numpy':
+            from .vectorized import unpack_arrays
+            return unpack_arrays(source, self, terminator)
+        columns = _raw_columns(self, source, terminator)
+        return [s.unpack_column(c) for s, c in zip(self._pos_specs, columns)]
+
+    def _iter_unpack_block(self, block, stride):
+        for values in _block_fields(self, block, stride, self._leaf_struct):
+            yield self._make_value(values)
+
     def _setup_to_str_funs(self):
         # Functions to call when we convert from a string to a value
         self._to_str_funs = []
@@ -52,14 +110,56 @@ class BaseSequence(Spec):
 
     @property
     def _struct_fmt(self):
-        return ''.join('%ds' % s.width for s in self._pos_specs)
+        return _slices_struct_fmt(self._field_slices, self._width)
+
+    def _setup_leaves(self):
+        _setup_leaves(self, self._pos_specs)
+
+    def _set_encoding(self, encoding):
+        """ Read and write the records in a single byte encoding """
+        self._encoding = encoding
+        # Copy each spec once, the elements of an Array share theirs
+        copies = {}
+        for spec in self._pos_specs:
+            if id(spec) not in copies:
+                copies[id(spec)] = _encoded(spec, encoding)
+        self._pos_specs = [copies[id(spec)] for spec in self._pos_specs]
+        self._setup_to_str_funs()
+        self._setup_to_bytes_funs()
+        self._unpack_funs = [p.unpack for p in self._pos_specs]
+        self._pack_funs = [p.pack for p in self._pos_specs]
+        self._setup_leaves()
+        self._setup_encoding()
+
+    def _setup_encoding(self):
+        _setup_encoding(self, self._pos_specs)
+
+    ## pickle protocol. Struct objects and the encoding functions cannot be
+    ## pickled
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_struct']
+        del state['_leaf_struct']
+        state.pop('_field_decoders', None)
+        state.pop('_field_encoders', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._struct = struct.Struct(self._struct_fmt)
+        self._setup_leaves()
+        if self._encoding is not None:
+            self._setup_encoding()
 
     ## Pack
     def pack(self, value):
         # Shortcut
         #if not self._to_bytes_funs:
-        calls = list(zip(self._pack_funs, value))
-        vals = [s(v) for s, v in calls]
+        if not self._contiguous:
+            buf = bytearray(self._blank * self._width)
+            self.pack_into(buf, 0, value)
+            return bytes(buf)
+        vals = _pack_fields(self, value)
         try:
             return b''.join(vals)
         except TypeError as e:
@@ -70,6 +170,56 @@ class BaseSequence(Spec):
         #    str_values[idx] = to_str(value[idx])
         #return b''.join(s(v) for s, v in zip(self._pack_funs, str_values))
 
+    def pack_into(self, buffer, offset, value):
+        """ Pack the value straight into a writable buffer at offset """
+        packed = _pack_fields(self, value)
+        if self._contiguous:
+            self._struct.pack_into(buffer, offset, *packed)
+            return
+        # Only write the elements, leaving the skipped bytes alone
+        for (start, end), text in zip(self._field_slices, packed):
+            buffer[offset+start:offset+end] = text
+
+    def pack_field_into(self, buffer, offset, field, value):
+        """ Pack value into a single element of the record at offset in a
+        writable buffer, leaving the rest of the record untouched. Nested
+        elements are given as a path of indexes and names, such as
+        (2, 'total').
+        """
+        if isinstance(field, (list, tuple)):
+            field, path = field[0], field[1:]
+        else:
+            path = ()
+        idx = self._field_position(field)
+        start, end = self._field_slices[idx]
+        if path:
+            spec = self._pos_specs[idx]
+            spec.pack_field_into(buffer, offset + start, path, value)
+        else:
+            buffer[offset+start:offset+end] = _pack_field(self, idx, value)
+
+    def _field_position(self, field):
+        return range(len(self._pos_specs))[field]
+
+    def _setup_field_slices(self):
+        # Where each element is found in the record text
+        self._field_slices = []
+        offset = 0
+        for spec in self._pos_specs:
+            self._field_slices.append((offset, offset + spec.width))
+            offset += spec.width
+        self._width = offset
+        self._contiguous = True
+
+    def _set_layout(self, field_slices, width):
+        """ Place the elements at the given slices of a record of width
+        bytes. Bytes outside of the slices are skipped when unpacking. """
+        self._field_slices = field_slices
+        self._width = width
+        self._contiguous = False
+        self._struct = struct.Struct(self._struct_fmt)
+        self._setup_leaves()
+
     def as_strings(self, value):
         """ Return a builtin NamedTuple that is an 'export' of the value
         into strings
@@ -89,6 +239,157 @@ class BaseSequence(Spec):
             if hasattr(spec, 'to_bytes'):
                 self._to_bytes_funs.append((idx, spec.to_bytes))
 
+def _slices_struct_fmt(field_slices, width):
+    """ The struct format which extracts each of the (start, end) slices of
+    a record of the given width and skips over the bytes in between """
+    fmt = []
+    pos = 0
+    for start, end in field_slices:
+        if start > pos:
+            fmt.append('%dx' % (start - pos))
+        fmt.append('%ds' % (end - start))
+        pos = end
+    if width > pos:
+        fmt.append('%dx' % (width - pos))
+    return ''.join(fmt)
+
+def _flattens(spec):
+    """ If the leaf fields of spec can be unpacked as part of the record
+    holding it. Specs with their own unpack, or their own encoding, are
+    unpacked as a single field.
+    """
+    from .mapping import _BaseDict
+    if isinstance(spec, (_BaseDict, BaseSequence)) and \
+            spec._encoding is not None:
+        return False
+    if isinstance(spec, _BaseDict):
+        base = _BaseDict
+        if spec._lazy:
+            return False
+    elif isinstance(spec, BaseSequence):
+        base = BaseSequence
+    else:
+        return False
+    cls = type(spec)
+    return (cls.unpack is base.unpack and
+            cls.unpack_from is base.unpack_from and
+            cls._make_value is base._make_value)
+
+def _setup_leaves(spec, children):
+    """ Work out the absolute slices of the leaf fields of the tree of
+    nested specs under spec, so that a single struct pulls out all of the
+    fields. _leaf_funs holds a (function, count) pair for each field, where
+    count is the number of leaves of a nested spec or None for a leaf. """
+    spec._leaf_slices = []
+    spec._leaf_funs = []
+    for child, (start, end) in zip(children, spec._field_slices):
+        if _flattens(child):
+            spec._leaf_funs.append((child._make_value,
+                                    len(child._leaf_slices)))
+            spec._leaf_slices.extend((start + s, start + e)
+                                     for s, e in child._leaf_slices)
+        else:
+            spec._leaf_funs.append((child.unpack, None))
+            spec._leaf_slices.append((start, end))
+    spec._nested = any(count is not None for f, count in spec._leaf_funs)
+    if spec._nested:
+        spec._leaf_struct = struct.Struct(
+            _slices_struct_fmt(spec._leaf_slices, spec._width))
+    else:
+        spec._leaf_struct = spec._struct
+
+def _assemble(leaf_funs, leaves):
+    """ The values of the fields of a spec from the byte strings of its
+    leaves """
+    values = []
+    pos = 0
+    for fun, count in leaf_funs:
+        if count is None:
+            values.append(fun(leaves[pos]))
+            pos += 1
+        else:
+            values.append(fun(leaves[pos:pos+count]))
+            pos += count
+    return values
+
+def _encoded(spec, encoding):
+    """ spec, or a copy of spec reading the encoding when it is a record
+    spec """
+    from .mapping import _BaseDict
+    if isinstance(spec, (_BaseDict, BaseSequence)) and \
+            spec._encoding != encoding:
+        spec = copy.copy(spec)
+        spec._set_encoding(encoding)
+    return spec
+
+def _setup_encoding(spec, children):
+    """ The translation table of the encoding of spec and the functions
+    which turn the translated field bytes into what the field specs take
+    and pack the text fields in the encoding. Text fields are given as
+    UTF-8 and fields with their own unpack get the bytes of the file. """
+    encoding = spec._encoding
+    spec._decode_table = translation_tables(encoding)[0]
+    spec._blank = ' '.encode(encoding)
+    spec._field_decoders = []
+    spec._field_encoders = []
+    for child, (start, end) in zip(children, spec._field_slices):
+        if type(child).unpack is Spec.unpack:
+            spec._field_decoders.append(to_utf8)
+            spec._field_encoders.append(
+                text_encoder(child, encoding, end - start))
+        else:
+            spec._field_decoders.append(raw_decoder(encoding))
+            spec._field_encoders.append(None)
+
+def _unpack_encoded(spec, buffer, offset):
+    """ The field bytes of the record of an encoded spec at offset in
+    buffer """
+    size = spec._struct.size
+    text = bytes(buffer[offset:offset+size]).translate(spec._decode_table)
+    values = spec._struct.unpack(text.ljust(size))
+    return [f(v) for f, v in zip(spec._field_decoders, values)]
+
+def _block_fields(spec, block, stride, struct_):
+    """ The field byte strings of each record in a block of records which
+    start every stride bytes """
+    rows = _framed_struct(struct_, stride)
+    if spec._encoding is None:
+        return rows.iter_unpack(block)
+    decoders = spec._field_decoders
+    block = bytes(block).translate(spec._decode_table)
+    return ([f(v) for f, v in zip(decoders, values)]
+            for values in rows.iter_unpack(block))
+
+def _pack_fields(spec, values):
+    """ The packed bytes of each field of the values """
+    if spec._encoding is None:
+        return [s(v) for s, v in zip(spec._pack_funs, values)]
+    return [s(v) if e is None else e(v)
+            for s, e, v in zip(spec._pack_funs, spec._field_encoders, values)]
+
+def _pack_field(spec, idx, value):
+    if spec._encoding is None or spec._field_encoders[idx] is None:
+        return spec._pack_funs[idx](value)
+    return spec._field_encoders[idx](value)
+
+def _raw_columns(spec, source, terminator):
+    """ The field byte strings of all the records in source, as a list per
+    field """
+    columns = [[] for _ in spec._field_slices]
+    for block, stride in iter_blocks(source, spec.width, terminator):
+        rows = _block_fields(spec, block, stride, spec._struct)
+        for column, values in zip(columns, zip(*rows)):
+            column.extend(values)
+    return columns
+
+def _framed_struct(struct_, stride):
+    """ A struct that skips over the record terminator which makes up the
+    difference between the struct size and the stride """
+    pad = stride - struct_.size
+    if not pad:
+        return struct_
+    return struct.Struct('%s%dx' % (struct_.format, pad))
+
 class _UnconvertedSequenceValueMixIn(object):
     def has_unconverted(self):
         return any(isinstance(s, UnconvertedValue) for s in self)
@@ -103,14 +404,63 @@ class _UnconvertedSequenceValueMixIn(object):
 
 ## NamedTuple
 class NamedTuple(BaseSequence):
-    def __init__(self, key_map=()):
+    def __init__(self, key_map=(), encoding=None):
         self._key_map = atom_to_spec_map(key_map)
         self._field_names = [n for n, c in self._key_map]
+        self._setup_types()
+
+        pos_specs = [c for n, c in self._key_map]
+        BaseSequence.__init__(self, pos_specs, encoding)
+
+    def _set_encoding(self, encoding):
+        BaseSequence._set_encoding(self, encoding)
+        self._key_map = list(zip(self._field_names, self._pos_specs))
+
+    def project(self, names):
+        """ A spec for the same record layout which only unpacks the named
+        fields. The struct skips over the other fields, so they are neither
+        sliced nor converted. Packing a value of the projection writes
+        blanks in place of the skipped fields. The fields keep their order
+        in the record, whatever the order of names, and a name given twice
+        is projected once. """
+        idxs = sorted(set(self._field_position(n) for n in names))
+        proj = NamedTuple([self._key_map[i] for i in idxs],
+                          encoding=self._encoding)
+        proj._set_layout([self._field_slices[i] for i in idxs], self._width)
+        return proj
+
+    def unpack_columns(self, source, terminator=b"\n", engine='python'):
+        """ Decode all of the records in source into a named tuple of
+        columns """
+        if engine == 'numpy':
+            from .vectorized import unpack_arrays
+            return unpack_arrays(source, self, terminator)
+        return self._str_itype(*BaseSequence.unpack_columns(
+            self, source, terminator))
+
+    def _field_position(self, field):
+        if isinstance(field, int):
+            return BaseSequence._field_position(self, field)
+        try:
+            return self._field_names.index(field)
+        except ValueError:
+            raise KeyError(field)
+
+    def _setup_types(self):
         self._str_itype = collections.namedtuple('BaseNamedTuple', self._field_names)
         self._itype = type('NamedTupleValue', (_NamedTupleValue, self._str_itype), {})
 
-        pos_specs = [c for n, c in self._key_map]
-        BaseSequence.__init__(self, pos_specs)
+    ## The value types are created on the fly so they are rebuilt
+    ## rather than pickled
+    def __getstate__(self):
+        state = BaseSequence.__getstate__(self)
+        del state['_str_itype']
+        del state['_itype']
+        return state
+
+    def __setstate__(self, state):
+        BaseSequence.__setstate__(self, state)
+        self._setup_types()
 
 class _NamedTupleValue(_UnconvertedSequenceValueMixIn):
     def __new__(cls, value, spec):
@@ -124,6 +474,12 @@ class _NamedTupleValue(_UnconvertedSequenceValueMixIn):
     def as_strings(self):
         return self._spec.as_strings(self)
 
+    def __reduce__(self):
+        return (_named_tuple_value, (tuple(self), self._spec))
+
+def _named_tuple_value(values, spec):
+    return spec._itype(values, spec)
+
 ## Tuple
 class Tuple(BaseSequence):
     def __init__(self, *a, **k):
@@ -154,6 +510,9 @@ class _TupleValue(tuple, _UnconvertedSequenceValueMixIn):
     def convert_errors(self):
         return list(self._convert_errors)
 
+    def __reduce__(self):
+        return (type(self), (tuple(self), self._spec, self._convert_errors))
+
     def pack(self):
         return self._spec.pack(self)
 
@@ -165,7 +524,7 @@ class List(BaseSequence):
         BaseSequence.__init__(self, *a, **k)
 
 class Array(List):
-    def __init__(self, count, spec):
+    def __init__(self, count, spec, encoding=None):
         self._str_itype = list
         self._itype = _ListValue
         self._count = count
@@ -174,7 +533,11 @@ class Array(List):
         self._setup_to_bytes_funs()
         self._unpack_funs = [p.unpack for p in self._pos_specs]
         self._pack_funs = [p.pack for p in self._pos_specs]
+        self._setup_field_slices()
         self._struct = struct.Struct(self._struct_fmt)
+        self._setup_leaves()
+        if encoding:
+            self._set_encoding(encoding)
 
 class _ListValue(list, _UnconvertedSequenceValueMixIn):
     def __init__(self, other, spec):
@@ -189,6 +552,9 @@ class _ListValue(list, _UnconvertedSequenceValueMixIn):
         rec = type(self)(self, self._spec)
         return rec
 
+    def __reduce__(self):
+        return (type(self), (list(self), self._spec))
+
     ## List Protocol
     def __setslice__(self, start, end, sublist):
         start, end = max(start, 0), max(end, 0)
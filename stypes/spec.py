@@ -42,14 +42,19 @@ from builtins import range
 from past.builtins import basestring
 from builtins import object
 
-import collections
+import array
 import re
 import six
 
+try:
+    from collections.abc import Sequence as _Sequence
+except ImportError:
+    from collections import Sequence as _Sequence
+
 from .util import UnconvertedValue
 __all__ = ['SpecificationError', 'spec_from_repr', 'Spec', 'String',
-           'MappedString', 'atom_to_scalar', 'atom_to_spec_map',
-           'atom_to_spec_seq']
+           'MappedString', 'DictionaryColumn', 'atom_to_scalar',
+           'atom_to_spec_map', 'atom_to_spec_seq']
 
 class SpecificationError(Exception):
     pass
@@ -68,6 +73,19 @@ class Spec(object):
         else:
             return s.decode().rstrip()
 
+    def unpack_column(self, values):
+        """ Given a sequence of byte strings for this field taken from many
+        records, return a column holding their values """
+        if hasattr(self, 'from_bytes'):
+            from_bytes = self.from_bytes
+            return [from_bytes(s.rstrip()) for s in values]
+        elif type(self).unpack is Spec.unpack:
+            return [s.decode().rstrip() for s in values]
+        else:
+            # Containers and other specs with their own unpack()
+            unpack = self.unpack
+            return [unpack(s) for s in values]
+
     def pack(self, value):
         """ Given a value object, return a byte representation """
         if hasattr(self, 'to_bytes'):
@@ -75,9 +93,80 @@ class Spec(object):
         else:
             return value.encode()[:self.width].ljust(self.width)
 
+    def pack_into(self, buffer, offset, value):
+        """ Pack value straight into a writable buffer (bytearray, mmap,
+        memoryview) at offset """
+        buffer[offset:offset+self.width] = self.pack(value)
+
+    def pack_many(self, values, terminator=b"\n"):
+        """ Pack each of the values and return them as one byte string with
+        every record followed by terminator """
+        term = terminator or b""
+        packed = [self.pack(v) for v in values]
+        if not packed:
+            return b""
+        return term.join(packed) + term
+
+    def iter_file(self, fileobj, terminator=b"\n", chunk_size=None):
+        """ Iterate over the records of a file object. The file is read in
+        large chunks instead of line by line. See stream.iter_unpack """
+        from .stream import iter_unpack
+        return iter_unpack(fileobj, self, terminator, chunk_size)
+
+    def unpack_from(self, buffer, offset=0):
+        """ Unpack the value starting at offset in buffer, which may be any
+        object supporting the buffer protocol (bytes, bytearray, memoryview,
+        mmap). Only the bytes of the value are copied out of the buffer. """
+        if six.PY3 and isinstance(buffer, str):
+            buffer = buffer.encode()
+        return self.unpack(bytes(buffer[offset:offset+self.width]))
+
+    def _iter_unpack_block(self, block, stride):
+        """ Yield a value for each record in block, a byte sequence holding
+        records that start every stride bytes """
+        width = self.width
+        for offset in range(0, len(block), stride):
+            yield self.unpack(block[offset:offset+width])
+
 class String(Spec):
-    def __init__(self, width):
+    """ Text of width bytes. Options for columns which repeat a few values:
+
+    intern=N shares the decoded text of up to N distinct values between
+    the records instead of decoding a new string for each.
+
+    dictionary=True makes unpack_column() give a DictionaryColumn.
+    """
+    _intern = None
+    _dictionary = False
+
+    def __init__(self, width, intern=None, dictionary=False):
         self.width = width
+        self._intern = intern
+        self._dictionary = dictionary
+        self._setup_intern()
+
+    def _setup_intern(self):
+        # Only interning strings have a from_bytes, plain ones are decoded
+        # inline by the records
+        if self._intern:
+            self._interned = {}
+            self.from_bytes = self._interned_from_bytes
+
+    def _interned_from_bytes(self, text):
+        """ The decoded text, shared while the table of up to intern values
+        has room """
+        try:
+            return self._interned[text]
+        except KeyError:
+            value = text.decode().rstrip()
+            if len(self._interned) < self._intern:
+                self._interned[text] = value
+            return value
+
+    def unpack_column(self, values):
+        if self._dictionary:
+            return _dictionary_column(self.unpack, values)
+        return Spec.unpack_column(self, values)
 
     def to_bytes(self, text):
         if text is None:
@@ -85,6 +174,17 @@ class String(Spec):
         else:
             return text.encode()
 
+    ## pickle protocol. The intern table is not kept
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_interned', None)
+        state.pop('from_bytes', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._setup_intern()
+
 class BoxedString(Spec):
     def __init__(self, size, count, sep='\r\n'):
         self.size = size
@@ -110,9 +210,20 @@ class BoxedString(Spec):
         return self.sep.join(lines)
 
 class MappedString(Spec):
-    def __init__(self, width, smap):
+    """ Text of width bytes mapped to a value through smap. The values are
+    the ones in smap, so they are shared between records already.
+    dictionary=True makes unpack_column() give a DictionaryColumn. """
+    _dictionary = False
+
+    def __init__(self, width, smap, dictionary=False):
         self._smap = smap
         self.width = width
+        self._dictionary = dictionary
+
+    def unpack_column(self, values):
+        if self._dictionary:
+            return _dictionary_column(self.unpack, values)
+        return Spec.unpack_column(self, values)
 
     def from_bytes(self, text):
         text = text.decode()
@@ -122,6 +233,43 @@ class MappedString(Spec):
             valid_strings = ', '.join(list(self._smap.keys()))
             return UnconvertedValue(text, 'Expected one of: %s' % valid_strings)
 
+class DictionaryColumn(_Sequence):
+    """ A dictionary encoded column: codes holds an index into values for
+    each record and values holds each distinct value once. It reads like
+    a list of the values. """
+    def __init__(self, codes, values):
+        self.codes = codes
+        self.values = values
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.values[c] for c in self.codes[index]]
+        return self.values[self.codes[index]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[c] for c in self.codes)
+
+    def __repr__(self):
+        return 'DictionaryColumn(codes=%r, values=%r)' % (self.codes,
+                                                          self.values)
+
+def _dictionary_column(unpack, texts):
+    """ The DictionaryColumn of the field byte strings, unpacking each
+    distinct one once """
+    codes = array.array('i')
+    values = []
+    index = {}
+    for text in texts:
+        code = index.get(text)
+        if code is None:
+            code = index[text] = len(values)
+            values.append(unpack(text))
+        codes.append(code)
+    return DictionaryColumn(codes, values)
 
 def tokenize_lines(r):
     """ break apart a full string representation into a list. useful for
@@ -168,7 +316,7 @@ def _split_key_spec(spec):
         name, _, width = spec.partition(":")
         name = name.strip()
         width = width.strip() if width else "1"
-    elif isinstance(spec, collections.Sequence):
+    elif isinstance(spec, _Sequence):
         if len(spec) > 1:
             name, width = spec[:2]
         elif len(spec) == 1:
@@ -285,7 +433,7 @@ def _split_field_layout(layout):
         name, _, width = layout.partition(":")
         name = name.strip()
         width = width.strip() if width else "1"
-    elif isinstance(layout, collections.Sequence):
+    elif isinstance(layout, _Sequence):
         if len(layout) > 1:
             name, width = layout[:2]
         elif len(layout) == 1:
@@ -0,0 +1,217 @@
+""" Streaming access to files of fixed-width records.
+
+Rather than calling readline() and unpack() for every record, the file is
+read in large chunks which are cut into blocks of whole records. Each block
+is handed to the specification which decodes every record in it with a
+single struct.iter_unpack() pass.
+"""
+import io
+import threading
+
+import six
+from six.moves import queue
+
+from .spec import Spec
+
+__all__ = ['iter_unpack', 'iter_blocks', 'RecordWriter', 'DEFAULT_CHUNK_SIZE']
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+def iter_unpack(fileobj, spec, terminator=b"\n", chunk_size=None):
+    """ Iterate over the records read from the file object using the given
+    spec. Records are expected to be spec.width bytes long, each followed
+    by terminator. Give a terminator of None for files where the records
+    follow each other directly.
+
+    Lines that are shorter or longer than the spec are tolerated the same
+    way unpack() tolerates them.
+    """
+    if not isinstance(spec, Spec):
+        from .mapping import Dict
+        spec = Dict(spec)
+    for block, stride in iter_blocks(fileobj, spec.width, terminator,
+                                     chunk_size):
+        for rec in spec._iter_unpack_block(block, stride):
+            yield rec
+
+def iter_blocks(source, width, terminator=b"\n", chunk_size=None):
+    """ Read source in chunks and yield (block, stride) pairs where block
+    holds whole records of width bytes that start every stride bytes.
+    source is a file object or a bytes-like object holding the records.
+    """
+    if not hasattr(source, 'read'):
+        source = io.BytesIO(source)
+    if chunk_size is None:
+        chunk_size = DEFAULT_CHUNK_SIZE
+    framer = _Framer(width, terminator)
+    read = source.read
+    while True:
+        data = read(chunk_size)
+        if not data:
+            break
+        if six.PY3 and isinstance(data, str):
+            data = data.encode()
+        block = framer.feed(data)
+        if block:
+            yield block, framer.stride
+    block = framer.finish()
+    if block:
+        yield block, framer.stride
+
+class RecordWriter(object):
+    """ Writes records to a file object, packing them into a buffer that is
+    written out buffer_records records at a time.
+
+    With background=True the buffers are written by a separate thread so
+    packing the next batch overlaps with the disk write of the previous one.
+    An error raised by the writing thread stops all further writes and is
+    raised again by the next call to write(), flush() or close().
+
+    with RecordWriter(fd, spec) as out:
+        for rec in recs:
+            out.write(rec)
+    """
+    def __init__(self, fileobj, spec, terminator=b"\n", buffer_records=4096,
+                 background=False):
+        if not isinstance(spec, Spec):
+            from .mapping import Dict
+            spec = Dict(spec)
+        self._fileobj = fileobj
+        self._pack = spec.pack
+        self._terminator = terminator or b""
+        self._buffer_records = buffer_records
+        self._pending = []
+        self._error = None
+        self._queue = None
+        self._thread = None
+        if background:
+            self._queue = queue.Queue(maxsize=2)
+            self._thread = threading.Thread(target=self._write_loop)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def write(self, rec):
+        self._pending.append(self._pack(rec))
+        if len(self._pending) >= self._buffer_records:
+            self._write_pending()
+
+    def write_many(self, recs):
+        for rec in recs:
+            self.write(rec)
+
+    def flush(self):
+        """ Write out all of the buffered records """
+        self._write_pending()
+        if self._queue is not None:
+            self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """ Flush the buffered records and stop the writing thread. The file
+        object is left open. """
+        try:
+            self.flush()
+        finally:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_pending(self):
+        self._raise_error()
+        if not self._pending:
+            return
+        data = self._terminator.join(self._pending) + self._terminator
+        self._pending = []
+        if self._queue is None:
+            self._fileobj.write(data)
+        else:
+            self._queue.put(data)
+
+    def _write_loop(self):
+        while True:
+            data = self._queue.get()
+            try:
+                if data is None:
+                    return
+                if self._error is None:
+                    self._fileobj.write(data)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+class _Framer(object):
+    """ Incrementally cuts a byte stream into blocks of records.
+
+    Every block returned holds whole records placed stride bytes apart,
+    each one width bytes of data followed by the terminator. Data that
+    does not line up that way (short lines, long lines) is split on the
+    terminator and each line is padded or truncated into place.
+    """
+    def __init__(self, width, terminator=b"\n"):
+        self.width = width
+        self.terminator = terminator or b""
+        self.stride = width + len(self.terminator)
+        self._tail = b""
+
+    def feed(self, data):
+        """ Add data read from the stream. Returns a block of the complete
+        records available so far, which may be empty. """
+        if self._tail:
+            data = self._tail + data
+        count = len(data) // self.stride
+        cut = count * self.stride
+        if not self.terminator or self._is_framed(data, count):
+            self._tail = data[cut:]
+            return data[:cut]
+
+        term = self.terminator
+        end = data.rfind(term)
+        if end == -1:
+            self._tail = data
+            return b""
+        self._tail = data[end + len(term):]
+        return self._frame_lines(data[:end].split(term))
+
+    def finish(self):
+        """ Returns a block holding the final record of the stream if it
+        was not followed by a terminator """
+        tail, self._tail = self._tail, b""
+        if not tail:
+            return b""
+        if self.terminator:
+            # The last line may or may not have been terminated
+            if tail.endswith(self.terminator):
+                tail = tail[:-len(self.terminator)]
+            return self._frame_lines(tail.split(self.terminator))
+        return tail.ljust(self.width) + self.terminator
+
+    def _is_framed(self, data, count):
+        """ Check that the terminator shows up at the end of each of the
+        first count records in data, and nowhere else in them. Short lines
+        can add up to the stride. """
+        if not count:
+            return False
+        for idx, byte in enumerate(bytearray(self.terminator)):
+            marks = data[self.width + idx:count * self.stride:self.stride]
+            if marks != six.int2byte(byte) * count:
+                return False
+        return data.count(self.terminator, 0, count * self.stride) == count
+
+    def _frame_lines(self, lines):
+        width = self.width
+        term = self.terminator
+        lines = [l if len(l) == width else l[:width].ljust(width)
+                 for l in lines]
+        return term.join(lines) + term
@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+
+from .aio import aiter_unpack, AsyncRecordWriter
+from .mapping import Dict
+from .numeric import Integer
+from .spec import String
+
+class _Sink(object):
+    def __init__(self):
+        self.writes = []
+        self.drains = 0
+
+    def write(self, data):
+        self.writes.append(data)
+
+    async def drain(self):
+        self.drains += 1
+
+class AsyncTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('name', String(6)),
+            ('age', Integer(3))])
+
+    def _run(self, coro):
+        return asyncio.run(coro)
+
+    def test_aiter_unpack(self):
+        async def read():
+            reader = asyncio.StreamReader()
+            reader.feed_data(b"jeremy031\ntom   04")
+            reader.feed_data(b"5\nbob")
+            reader.feed_eof()
+            return [r async for r in aiter_unpack(reader, self._spec,
+                                                  batch_size=1)]
+        recs = self._run(read())
+        self.assertEqual(recs, [{'name': 'jeremy', 'age': 31},
+                                {'name': 'tom', 'age': 45},
+                                {'name': 'bob', 'age': None}])
+
+    def test_writer(self):
+        sink = _Sink()
+        async def write():
+            async with AsyncRecordWriter(sink, self._spec,
+                                         buffer_records=2) as out:
+                await out.write_many([
+                    {'name': 'jeremy', 'age': 31},
+                    {'name': 'tom', 'age': 45},
+                    {'name': 'bob', 'age': 7}])
+        self._run(write())
+        self.assertEqual(sink.writes, [b"jeremy031\ntom   045\n",
+                                       b"bob   007\n"])
+        self.assertEqual(sink.drains, 2)
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,85 @@
+import datetime
+from decimal import Decimal
+import unittest
+
+from .arrow import pa, to_arrow_schema, read_arrow
+from .date import Date
+from .mapping import Dict
+from .numeric import Integer, Numeric
+from .sequence import Array, NamedTuple
+from .spec import MappedString, String
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class ArrowTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('name', String(4)),
+            ('count', Integer(3)),
+            ('amount', Numeric('S9(3).99')),
+            ('born', Date('%Y%m%d')),
+            ('codes', Array(2, Integer(1))),
+            ('extra', Dict([('flag', String(1)), ('n', Integer(1))]))])
+        self._data = (b"aaaa012 001.251970010112Y1\n"
+                      b"bbbbX12-100.00        34N2\n")
+
+    def test_schema(self):
+        schema = to_arrow_schema(self._spec)
+        self.assertEqual(schema.names,
+                         ['name', 'count', 'amount', 'born', 'codes', 'extra'])
+        self.assertEqual(schema.field('count').type, pa.int64())
+        self.assertEqual(schema.field('amount').type, pa.decimal128(5, 2))
+        self.assertEqual(schema.field('born').type, pa.date32())
+        self.assertEqual(schema.field('codes').type,
+                         pa.list_(pa.int64(), 2))
+        self.assertEqual(schema.field('extra').type, pa.struct([
+            pa.field('flag', pa.string()), pa.field('n', pa.int64())]))
+        self.assertEqual(self._spec.to_arrow_schema(), schema)
+
+    def test_numeric_result_types(self):
+        spec = Dict([('a', Numeric('9V99', as_='int_scaled')),
+                     ('b', Numeric('9V99', as_='float'))])
+        schema = spec.to_arrow_schema()
+        self.assertEqual(schema.field('a').type, pa.int64())
+        self.assertEqual(schema.field('b').type, pa.float64())
+        batch = next(spec.read_arrow(b"125250\n"))
+        self.assertEqual(batch.to_pylist(), [{'a': 125, 'b': 2.5}])
+
+    def test_punctuated_fraction(self):
+        spec = Dict([('a', Numeric('99.9,99'))])
+        self.assertEqual(spec.to_arrow_schema().field('a').type,
+                         pa.decimal128(5, 3))
+        batch = next(spec.read_arrow(b"12.3,45\n"))
+        self.assertEqual(batch.column(0).to_pylist(), [Decimal('12.345')])
+
+    def test_read_arrow(self):
+        batches = list(self._spec.read_arrow(self._data))
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0].to_pylist(), [
+            {'name': 'aaaa', 'count': 12, 'amount': Decimal('1.25'),
+             'born': datetime.date(1970, 1, 1), 'codes': [1, 2],
+             'extra': {'flag': 'Y', 'n': 1}},
+            {'name': 'bbbb', 'count': None, 'amount': Decimal('-100.00'),
+             'born': None, 'codes': [3, 4],
+             'extra': {'flag': 'N', 'n': 2}}])
+
+    def test_batch_size(self):
+        spec = NamedTuple([('a', String(1)), ('b', Integer(2))])
+        data = b"".join(b"x%02d\n" % i for i in range(10))
+        batches = list(read_arrow(data, spec, batch_size=4))
+        self.assertEqual([b.num_rows for b in batches], [4, 4, 2])
+        self.assertEqual(batches[2].column(1).to_pylist(), [8, 9])
+
+    def test_dictionary(self):
+        spec = Dict([('state', String(2, dictionary=True)),
+                     ('kind', MappedString(1, {'A': 'active'},
+                                           dictionary=True))])
+        self.assertEqual(to_arrow_schema(spec).field('state').type,
+                         pa.dictionary(pa.int32(), pa.string()))
+        batch = next(read_arrow(b"NYA\nCAX\nNYA\n", spec))
+        state = batch.column(0)
+        self.assertEqual(state.dictionary.to_pylist(), ['NY', 'CA'])
+        self.assertEqual(state.indices.to_pylist(), [0, 1, 0])
+        self.assertEqual(batch.column(1).to_pylist(),
+                         ['active', None, 'active'])
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,93 @@
+import datetime
+from decimal import Decimal
+import pickle
+import unittest
+
+from .cached import Cached
+from .date import Date
+from .mapping import Dict
+from .numeric import Integer, Numeric, Packed
+from .sequence import Array
+from .spec import MappedString, String
+from .util import LRUCache, UnconvertedValue
+
+class CachedTestCase(unittest.TestCase):
+    def setUp(self):
+        self._date = Cached(Date("%Y%m%d"), maxsize=2)
+
+    def test_unpack(self):
+        self.assertEqual(self._date.width, 8)
+        first = self._date.unpack(b"20040101")
+        self.assertEqual(first, datetime.date(2004, 1, 1))
+        self.assertIs(self._date.unpack(b"20040101"), first)
+        self.assertIsNone(self._date.unpack(b"        "))
+        self.assertEqual(self._date.cache_info(), (1, 2, 2, 2))
+
+    def test_eviction(self):
+        first = self._date.unpack(b"20040101")
+        self._date.unpack(b"20040102")
+        self._date.unpack(b"20040103")
+        self.assertIsNot(self._date.unpack(b"20040101"), first)
+        self.assertEqual(self._date.cache_info().hits, 0)
+
+    def test_pack(self):
+        spec = Cached(Integer(3))
+        self.assertEqual(spec.pack(12), b"012")
+        self.assertEqual(spec.pack(12), b"012")
+        self.assertEqual(spec.cache_info().hits, 1)
+        self.assertEqual(Cached(String(3)).pack(u"abcd"), b"abc")
+
+    def test_same_values(self):
+        for spec in [String(5), String(5, intern=4), Numeric('99.99')]:
+            for text in [b"ab\x1c  ", b"ab\xc2\xa0", b"12.5 ", b"     "]:
+                self.assertEqual(repr(Cached(spec).unpack(text)),
+                                 repr(spec.unpack(text)))
+
+    def test_unconverted(self):
+        spec = Cached(MappedString(1, {'A': 'active'}))
+        self.assertEqual(spec.unpack(b"A"), 'active')
+        self.assertIsInstance(spec.unpack(b"X"), UnconvertedValue)
+
+    def test_own_unpack(self):
+        spec = Cached(Packed('S9(3)'))
+        self.assertEqual(spec.pack(-12), b"\x01\x2d")
+        self.assertEqual(spec.unpack(b"\x01\x2d"), -12)
+        self.assertEqual(spec.unpack_column([b"\x01\x2d", b"\x01\x2d"]),
+                         [-12, -12])
+        self.assertEqual(spec.cache_info().hits, 2)
+
+    def test_in_record(self):
+        spec = Dict([('amount', Cached(Numeric('999.99'))),
+                     ('codes', Array(2, Cached(String(2)))),
+                     ('packed', Cached(Packed('9(3)')))])
+        text = b"001.25aba \x01\x2f"
+        rec = spec.unpack(text)
+        self.assertEqual(rec, {'amount': Decimal('1.25'),
+                               'codes': ['ab', 'a'], 'packed': 12})
+        self.assertEqual(rec.pack(), text)
+        self.assertEqual(spec.compile().unpack(text), rec)
+
+    def test_container(self):
+        self.assertRaises(TypeError, Cached, Dict([('a', 1)]))
+
+    def test_pickle(self):
+        self._date.unpack(b"20040101")
+        spec = pickle.loads(pickle.dumps(self._date))
+        self.assertEqual(spec.cache_info(), (0, 0, 2, 0))
+        self.assertEqual(spec.unpack(b"20040101"), datetime.date(2004, 1, 1))
+        spec = pickle.loads(pickle.dumps(Cached(Packed('9(3)'))))
+        self.assertEqual(spec.unpack(b"\x01\x2f"), 12)
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_counters(self):
+        cache = LRUCache(2)
+        cache['a'] = 1
+        cache['b'] = 2
+        self.assertEqual(cache.get('a'), 1)
+        cache['c'] = 3
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits), (0, 0))
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,81 @@
+from io import BytesIO
+import pickle
+import unittest
+
+from .compiler import CompiledSpec
+from .mapping import Dict
+from .numeric import Integer, Numeric
+from .odict import OrderedDict
+from .sequence import Array, NamedTuple, Tuple
+from .spec import String
+from .stream import iter_unpack
+from .util import UnconvertedValue
+
+class CompiledSpecTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('name', String(6)),
+            ('age', Integer(3)),
+            ('amount', Numeric('S9(3).99')),
+            ('kids', Array(2, NamedTuple([('n', String(2)),
+                                          ('a', Integer(2))]))),
+            ('extra', OrderedDict([('flag', 1), ('code', 2)]))])
+        self._line = b"jeremy031 001.25aa01bb02Yxy"
+
+    def test_unpack_matches(self):
+        fast = self._spec.compile()
+        for line in [self._line, b"tom   012", b"", u"bob   007"]:
+            self.assertEqual(fast.unpack(line), self._spec.unpack(line))
+
+    def test_value_types(self):
+        rec = self._spec.compile().unpack(self._line)
+        self.assertIs(rec._spec, self._spec)
+        self.assertEqual(rec['kids'][1].n, 'bb')
+        self.assertEqual(type(rec['extra']).__name__, 'OrderedDictValue')
+        self.assertEqual(rec.pack(), self._spec.pack(rec))
+
+    def test_unconverted(self):
+        rec = self._spec.compile().unpack(b"tom   X12")
+        self.assertTrue(isinstance(rec['age'], UnconvertedValue))
+
+    def test_pack(self):
+        fast = self._spec.compile()
+        rec = self._spec.unpack(self._line)
+        self.assertEqual(fast.pack(rec), self._spec.pack(rec))
+        self.assertRaises(KeyError, fast.pack, {'name': 'x'})
+
+    def test_unpack_from(self):
+        fast = self._spec.compile()
+        data = bytearray(b"xx" + self._line)
+        self.assertEqual(fast.unpack_from(data, 2),
+                         self._spec.unpack(self._line))
+
+    def test_iter_unpack(self):
+        spec = Tuple([String(2), Integer(2)])
+        recs = list(iter_unpack(BytesIO(b"ab01\ncd02\n"), spec.compile()))
+        self.assertEqual(recs, [('ab', 1), ('cd', 2)])
+
+    def test_projection(self):
+        spec = NamedTuple([('a', String(2)), ('b', Integer(2)),
+                           ('c', String(1))]).project(['a', 'c'])
+        fast = spec.compile()
+        rec = fast.unpack(b"ab12c")
+        self.assertEqual(rec, spec.unpack(b"ab12c"))
+        self.assertEqual(fast.pack(rec), b"ab  c")
+
+    def test_lazy(self):
+        self.assertRaises(TypeError, CompiledSpec, Dict([('a', 1)], lazy=True))
+        spec = Dict([('a', 1), ('b', Dict([('c', 1)], lazy=True))])
+        rec = spec.compile().unpack(b"xy")
+        self.assertEqual(rec['b']['c'], 'y')
+
+    def test_encoding(self):
+        self.assertRaises(TypeError, CompiledSpec,
+                          Dict([('a', 1)], encoding='cp037'))
+
+    def test_pickle(self):
+        fast = pickle.loads(pickle.dumps(self._spec.compile()))
+        self.assertEqual(fast.unpack(self._line),
+                         self._spec.unpack(self._line))
+
+if __name__ == '__main__': unittest.main()
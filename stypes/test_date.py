@@ -1,7 +1,9 @@
 import datetime
+import pickle
 import unittest
 
 from .date import Date, Datetime
+from .util import UnconvertedValue
 
 class DateTestCase(unittest.TestCase):
     def setUp(self):
@@ -17,6 +19,28 @@ class DateTestCase(unittest.TestCase):
         v = datetime.date(2004, 1, 1)
         self.assertEqual(self._s.to_bytes(v), b"20040101")
 
+    def test_compiled_format(self):
+        spec = Date("%m/%d/%y")
+        self.assertIsNotNone(spec._plan)
+        self.assertEqual(spec.from_bytes(b"02/29/68"), datetime.date(2068, 2, 29))
+        self.assertEqual(spec.from_bytes(b"12/31/69"), datetime.date(1969, 12, 31))
+        self.assertEqual(spec.to_bytes(datetime.date(2004, 1, 2)), b"01/02/04")
+        self.assertIsInstance(spec.from_bytes(b"02/30/04"), UnconvertedValue)
+        self.assertIsInstance(spec.from_bytes(b"1x/01/04"), UnconvertedValue)
+
+    def test_strptime_fallback(self):
+        spec = Date("%b %d %Y")
+        self.assertIsNone(spec._plan)
+        self.assertEqual(spec.from_bytes(b"Jan 02 2004"), datetime.date(2004, 1, 2))
+        # Text the compiled format does not match is still left to strptime
+        self.assertEqual(self._s.from_bytes(b"2004011"), datetime.date(2004, 1, 1))
+        self.assertEqual(self._s.to_bytes(datetime.date(999, 1, 1)),
+                         datetime.date(999, 1, 1).strftime("%Y%m%d").encode())
+
+    def test_pickle(self):
+        spec = pickle.loads(pickle.dumps(self._s))
+        self.assertEqual(spec.from_bytes(b"20040101"), datetime.date(2004, 1, 1))
+
 class DateTimeTestCase(unittest.TestCase):
     def setUp(self):
         self._s =  Datetime("%Y%m%d %H%M%S")
@@ -30,4 +54,15 @@ class DateTimeTestCase(unittest.TestCase):
     def test_width(self):
         self.assertEqual(self._s.width, 15)
 
+    def test_compiled_format(self):
+        self.assertIsNotNone(self._s._plan)
+        self.assertIsInstance(self._s.from_bytes(b"20100502 250000"),
+                              UnconvertedValue)
+        self.assertEqual(self._s.to_bytes(datetime.date(2010, 5, 2)),
+                         b"20100502 000000")
+        self.assertEqual(Date("%Y%m%d %H%M").from_bytes(b"20100502 1330"),
+                         datetime.date(2010, 5, 2))
+        self.assertIsInstance(Date("%Y%m%d %H").from_bytes(b"20100502 24"),
+                              UnconvertedValue)
+
 if __name__ == '__main__': unittest.main()
@@ -0,0 +1,79 @@
+from io import BytesIO
+import unittest
+
+from .dispatch import Dispatch
+from .mapping import Dict
+from .numeric import Integer
+from .sequence import Tuple
+from .spec import SpecificationError, String
+from .stream import iter_unpack
+from .util import UnconvertedValue
+
+class DispatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self._header = Dict([('type', 1), ('batch', Integer(4))])
+        self._detail = Dict([('type', 1), ('name', 6), ('age', Integer(3))])
+        self._trailer = Tuple([String(1), Integer(2)])
+        self._spec = Dispatch(0, 1, {
+            'H': self._header,
+            'D': self._detail,
+            'T': self._trailer})
+
+    def test_width(self):
+        self.assertEqual(self._spec.width, 10)
+
+    def test_unpack(self):
+        rec = self._spec.unpack(b"Djeremy031")
+        self.assertEqual(rec, {'type': 'D', 'name': 'jeremy', 'age': 31})
+        self.assertEqual(self._spec.unpack(b"H0012")['batch'], 12)
+        self.assertEqual(self._spec.unpack(b"T02"), ('T', 2))
+
+    def test_unknown(self):
+        rec = self._spec.unpack(b"Xjunk")
+        self.assertIsInstance(rec, UnconvertedValue)
+
+    def test_default(self):
+        spec = Dispatch(0, 1, {'H': self._header}, default=self._trailer)
+        self.assertEqual(spec.unpack(b"X05"), ('X', 5))
+
+    def test_bad_code(self):
+        self.assertRaises(SpecificationError, Dispatch, 0, 2,
+                          {'H': self._header})
+
+    def test_pack(self):
+        rec = self._spec.unpack(b"Djeremy031")
+        rec['age'] = 32
+        self.assertEqual(self._spec.pack(rec), b"Djeremy032")
+        self.assertRaises(TypeError, self._spec.pack, {'type': 'D'})
+
+    def test_pack_compiled(self):
+        spec = Dispatch(0, 1, {'D': self._detail.compile()})
+        rec = spec.unpack(b"Djeremy031")
+        self.assertEqual(spec.pack(rec), b"Djeremy031")
+
+    def test_iter_terminated(self):
+        data = BytesIO(b"H0012\nDjeremy031\nDtom   045\nT02\n")
+        recs = list(iter_unpack(data, self._spec))
+        self.assertEqual(recs[0], {'type': 'H', 'batch': 12})
+        self.assertEqual([r['name'] for r in recs[1:3]], ['jeremy', 'tom'])
+        self.assertEqual(recs[3], ('T', 2))
+
+    def test_iter_terminated_short_last_line(self):
+        spec = Dispatch(0, 1, {'D': self._detail, 'T': self._trailer})
+        recs = list(spec.iter_file(BytesIO(b"Djeremy031\nT02\n")))
+        self.assertEqual(len(recs), 2)
+        self.assertEqual(recs[1], ('T', 2))
+
+    def test_iter_unterminated(self):
+        data = BytesIO(b"H0012Djeremy031Dtom   045T02")
+        recs = list(self._spec.iter_file(data, terminator=None, chunk_size=4))
+        self.assertEqual(len(recs), 4)
+        self.assertEqual(recs[2]['age'], 45)
+        self.assertEqual(recs[3], ('T', 2))
+
+    def test_iter_unterminated_unknown(self):
+        data = BytesIO(b"H0012Xjunk")
+        recs = self._spec.iter_file(data, terminator=None)
+        self.assertRaises(ValueError, list, recs)
+
+if __name__ == '__main__': unittest.main()
@@ -1,10 +1,15 @@
+import array
+from decimal import Decimal
+import io
+import pickle
 import unittest
 
 from .mapping import Dict
 from .odict import OrderedDict
-from .numeric import Integer, Numeric, NumericFormatError
-from .sequence import Array
-from .spec import String
+from .numeric import Integer, Numeric, NumericFormatError, Packed
+from .sequence import Array, NamedTuple
+from .spec import SpecificationError, String
+from .util import UnconvertedValue
 
 class OrderedDictTestCase(unittest.TestCase):
     def setUp(self):
@@ -192,4 +197,254 @@ class DictTestCase(unittest.TestCase):
         self.assertEqual(r['address']['line_1'], '100 elm st')
         self.assertEqual(r['address']['line_2'], 'belton, tx')
 
+class UnpackFromTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('name', String(6)),
+            ('age', Integer(3)),
+            ('colors', Array(2, Integer(1)))])
+
+    def test_buffers(self):
+        data = b"XXjeremy03112tom   045"
+        expected = {'name': 'jeremy', 'age': 31, 'colors': [1, 2]}
+        for buf in [data, bytearray(data), memoryview(data)]:
+            self.assertEqual(self._spec.unpack_from(buf, 2), expected)
+        self.assertEqual(self._spec.unpack(memoryview(data)[2:13]), expected)
+
+    def test_short(self):
+        rec = self._spec.unpack_from(bytearray(b"XXjeremy03112tom   045"), 13)
+        self.assertEqual(rec, {'name': 'tom', 'age': 45,
+                               'colors': [None, None]})
+
+    def test_lazy(self):
+        spec = Dict(self._spec._spec_map, lazy=True)
+        rec = spec.unpack_from(memoryview(b"XXjeremy031"), 2)
+        self.assertEqual(rec['age'], 31)
+        self.assertEqual(rec.pack(), b"jeremy031  ")
+
+    def test_scalar(self):
+        self.assertEqual(Integer(3).unpack_from(bytearray(b"xx042"), 2), 42)
+
+class PackIntoTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('name', String(6)),
+            ('age', Integer(3)),
+            ('items', Array(2, Dict([
+                ('code', 2),
+                ('total', Numeric('99.99'))])))])
+        self._buf = bytearray(b"XXjeremy031AA01.00BB02.00\n")
+
+    def test_pack_into(self):
+        rec = self._spec.unpack_from(self._buf, 2)
+        rec['age'] = 32
+        self._spec.pack_into(self._buf, 2, rec)
+        self.assertEqual(self._buf, b"XXjeremy032AA01.00BB02.00\n")
+
+    def test_pack_field_into(self):
+        self._spec.pack_field_into(self._buf, 2, 'name', 'tom')
+        self.assertEqual(self._buf, b"XXtom   031AA01.00BB02.00\n")
+        self._spec.pack_field_into(self._buf, 2, ('items', 1, 'total'),
+                                   Decimal('12.5'))
+        self.assertEqual(self._buf, b"XXtom   031AA01.00BB12.50\n")
+        self._spec.pack_field_into(memoryview(self._buf), 2, ('items', -2),
+                                   {'code': 'ZZ', 'total': None})
+        self.assertEqual(self._buf, b"XXtom   031ZZ     BB12.50\n")
+        self.assertRaises(KeyError, self._spec.pack_field_into,
+                          self._buf, 2, 'missing', 'x')
+
+class ProjectTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('first_name', String(12)),
+            ('last_name',  String(15)),
+            ('middle_initial', String(1)),
+            ('age', Integer(3)),
+            ('colors', Array(3, Integer(4)))])
+        self._inp = b"jeremy      lowery         s031000100020003"
+
+    def test_project(self):
+        proj = self._spec.project(['age', 'first_name'])
+        self.assertEqual(proj.width, self._spec.width)
+        self.assertEqual(proj._struct.format, '12s16x3s12x')
+        self.assertEqual(proj.unpack(self._inp),
+                         {'first_name': 'jeremy', 'age': 31})
+
+    def test_project_pack(self):
+        proj = self._spec.project(['last_name'])
+        rec = proj.unpack(self._inp)
+        rec['last_name'] = 'smith'
+        self.assertEqual(rec.pack(), b" " * 12 + b"smith" + b" " * 26)
+        buf = bytearray(self._inp)
+        proj.pack_into(buf, 0, rec)
+        self.assertEqual(buf, b"jeremy      smith          s031000100020003")
+
+    def test_project_lazy(self):
+        proj = Dict(self._spec._spec_map, lazy=True).project(['age'])
+        rec = proj.unpack(self._inp)
+        rec['age'] = 40
+        self.assertEqual(rec.pack(), b"jeremy      lowery         s040000100020003")
+
+    def test_project_stream(self):
+        proj = self._spec.project(['colors'])
+        recs = list(proj.iter_file(io.BytesIO(self._inp + b"\n")))
+        self.assertEqual(recs, [{'colors': [1, 2, 3]}])
+
+    def test_project_unknown(self):
+        self.assertRaises(KeyError, self._spec.project, ['nope'])
+
+    def test_project_repeated(self):
+        proj = self._spec.project(['age', 'age'])
+        self.assertEqual(proj.unpack(self._inp), {'age': 31})
+
+class UnpackColumnsTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('name', String(6)),
+            ('age', Integer(3)),
+            ('weight', Numeric('999.99'))])
+
+    def test_columns(self):
+        data = b"jeremy031150.25\ntom   045200.00\n"
+        cols = self._spec.unpack_columns(data)
+        self.assertEqual(cols['name'], ['jeremy', 'tom'])
+        self.assertEqual(cols['age'], array.array('q', [31, 45]))
+        self.assertEqual(cols['weight'], [Decimal('150.25'), Decimal('200')])
+
+    def test_unconverted(self):
+        cols = self._spec.unpack_columns(io.BytesIO(b"jeremyX31\ntom\n"))
+        self.assertEqual(cols['age'][1], None)
+        self.assertIsInstance(cols['age'][0], UnconvertedValue)
+
+    def test_projection(self):
+        cols = self._spec.project(['age']).unpack_columns(
+            b"jeremy031150.25tom   045200.00", terminator=None)
+        self.assertEqual(cols, {'age': array.array('q', [31, 45])})
+
+class LazyDictTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('first_name', String(12)),
+            ('age', Integer(3)),
+            ('weight', Numeric('999.99')),
+            ('colors', Array(3, Integer(4)))], lazy=True)
+        self._inp = b"jeremy      031  2.25000100020003"
+
+    def test_lazy(self):
+        rec = self._spec.unpack(self._inp)
+        self.assertEqual(rec._values, {})
+        self.assertEqual(rec['age'], 31)
+        self.assertEqual(list(rec._values), ['age'])
+        self.assertEqual(rec, {'first_name': 'jeremy', 'age': 31,
+                               'weight': Decimal('2.25'),
+                               'colors': [1, 2, 3]})
+        self.assertEqual(list(rec.keys()),
+                         ['first_name', 'age', 'weight', 'colors'])
+
+    def test_pack_keeps_raw_text(self):
+        rec = self._spec.unpack(self._inp)
+        rec['weight']
+        self.assertEqual(rec.pack(), self._inp)
+        rec['age'] = 32
+        rec['colors'][0] = '9'
+        self.assertEqual(rec.pack(), b"jeremy      032  2.25000900020003")
+
+    def test_unpack_lazy(self):
+        spec = Dict([('age', Integer(3)), ('name', 5)])
+        rec = spec.unpack_lazy(b"X12bob")
+        self.assertEqual(rec['name'], 'bob')
+        self.assertTrue(rec.has_unconverted())
+        self.assertEqual(rec.pack(), b"X12bob  ")
+        self.assertRaises(KeyError, lambda: rec['missing'])
+        self.assertRaises(TypeError, rec.clear)
+
+    def test_same_as_eager(self):
+        eager = Dict(self._spec._spec_map)
+        self.assertEqual(eager.unpack(self._inp), self._spec.unpack(self._inp))
+
+class FlattenTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('id', Integer(2)),
+            ('items', Array(2, Dict([('code', String(2)),
+                                     ('qty', Integer(2))]))),
+            ('total', Integer(3))])
+
+    def test_single_struct(self):
+        self.assertEqual(len(self._spec._leaf_slices), 6)
+        self.assertEqual(self._spec._leaf_slices[3], (6, 8))
+        self.assertEqual(self._spec._leaf_struct.size, self._spec.width)
+
+    def test_unpack(self):
+        rec = self._spec.unpack(b"01ab02cd03123")
+        self.assertEqual(rec, {'id': 1, 'total': 123, 'items': [
+            {'code': 'ab', 'qty': 2}, {'code': 'cd', 'qty': 3}]})
+        items_spec = self._spec._spec_map[1][1]
+        self.assertIs(rec['items'][1]._spec, items_spec._pos_specs[1])
+        self.assertEqual(rec.pack(), b"01ab02cd03123")
+        self.assertEqual(self._spec.unpack(b"01ab")['items'][1],
+                         {'code': '', 'qty': None})
+
+    def test_projection(self):
+        proj = self._spec.project(['items'])
+        rec = proj.unpack_from(b"xx01ab02cd03123", 2)
+        self.assertEqual(rec['items'][1], {'code': 'cd', 'qty': 3})
+
+    def test_lazy_child(self):
+        spec = Dict([('a', 1), ('b', Dict([('c', 2)], lazy=True))])
+        self.assertEqual(spec._leaf_slices, [(0, 1), (1, 3)])
+        self.assertEqual(spec.unpack(b"xyz")['b']['c'], 'yz')
+
+class EncodingTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('name', String(6)),
+            ('amount', Numeric('S9(3).99')),
+            ('packed', Packed('S9(3)')),
+            ('items', Array(2, NamedTuple([('code', String(2))])))],
+            encoding='cp037')
+        self._rec = {'name': u'Zo\xeb', 'amount': Decimal('-1.25'),
+                     'packed': -12, 'items': [('ab',), (u'\xe9',)]}
+        self._line = (b"\xe9\x96S@@@" b"`\xf0\xf0\xf1K\xf2\xf5"
+                      b"\x01-" b"\x81\x82" b"Q@")
+
+    def test_pack(self):
+        self.assertEqual(self._spec.pack(self._rec), self._line)
+
+    def test_unpack(self):
+        rec = self._spec.unpack(self._line)
+        self.assertEqual(rec['name'], u'Zo\xeb')
+        self.assertEqual(rec['amount'], Decimal('-1.25'))
+        self.assertEqual(rec['packed'], -12)
+        self.assertEqual(rec['items'][1].code, u'\xe9')
+        self.assertEqual(rec.pack(), self._line)
+        self.assertEqual(rec['items'][0].pack(), b"\x81\x82")
+
+    def test_truncate(self):
+        rec = dict(self._rec, name=u'\xe9\xe9\xe9\xe9\xe9\xe9\xe9')
+        self.assertEqual(self._spec.pack(rec)[:6], b"Q" * 6)
+
+    def test_iter_file(self):
+        data = io.BytesIO(self._line * 3)
+        recs = list(self._spec.iter_file(data, terminator=None))
+        self.assertEqual(len(recs), 3)
+        self.assertEqual(recs[2]['items'][1].code, u'\xe9')
+        cols = self._spec.unpack_columns(self._line * 2, terminator=None)
+        self.assertEqual(cols['packed'], [-12, -12])
+
+    def test_project(self):
+        proj = self._spec.project(['amount'])
+        self.assertEqual(proj.unpack(self._line),
+                         {'amount': Decimal('-1.25')})
+
+    def test_pickle(self):
+        spec = pickle.loads(pickle.dumps(self._spec))
+        self.assertEqual(spec.unpack(self._line).pack(), self._line)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            Dict([('a', 1)], encoding='utf-8')
+        with self.assertRaises(SpecificationError):
+            Dict([('a', 1)], lazy=True, encoding='cp037')
+
 if __name__ == '__main__': unittest.main()
@@ -1,8 +1,9 @@
 from decimal import Decimal
+import io
 import unittest
 
 from .mapping import Dict
-from .numeric import Integer, Numeric, NumericFormatError
+from .numeric import Integer, Numeric, NumericFormatError, Packed, Binary
 
 class IntegerTestCase(unittest.TestCase):
     def test_integer_conversion(self):
@@ -68,6 +69,31 @@ class NumericTestCase(unittest.TestCase):
         test("S999.99", "-  2.25", "-2.25")
         test("999.99S", "  2.25-", "-2.25")
 
+    def test_compiled_picture(self):
+        def test(nfmt, inp):
+            spec = Numeric(nfmt)
+            text = inp.rjust(spec.width)
+            self.assertEqual(repr(spec.from_bytes(inp.encode())),
+                             repr(spec._convert(text)))
+
+        self.assertIsNotNone(Numeric("S9(5)V99")._fast_re)
+        self.assertIsNotNone(Numeric("999,999.99")._fast_re)
+        self.assertIsNone(Numeric("9V9V9")._fast_re)
+        self.assertIsNotNone(Numeric("999,999.99")._punct_mask)
+        self.assertIsNone(Numeric("S9,999.99")._punct_mask)
+        self.assertIsNone(Numeric("9,999V99")._punct_mask)
+        test("999,999.99", "123,456.78")
+        test("999,999.99", "  1,2 4.5 ")
+        test("999,999.99", "1,234.56")
+        test("999,999.99", "123,45678")
+        test("999,999.99", "123.456,78")
+        test("99.9,99", "12.3,45")
+        test("S9(5)V99", "-0000000")
+        test("999.99", "12a.00")
+        test("999.99", "123,00")
+        test("9(3)", "1 2")
+        test("9V9V9", "123")
+
     def test_to_bytes(self):
         def test(nfmt, inp, outp):
             f = Numeric(nfmt)
@@ -86,6 +112,65 @@ class NumericTestCase(unittest.TestCase):
         test("S999.99", "-2.25", "-002.25")
         test("999.99S", "-2.25", "002.25-")
 
+    def test_compiled_encoder(self):
+        def test(nfmt, value):
+            spec = Numeric(nfmt)
+            text = spec._precision_fmt % abs(value)
+            self.assertEqual(repr(spec.to_bytes(value)),
+                             repr(spec._write_text(value, text)))
+
+        self.assertIsNotNone(Numeric("999,999.99")._enc_template)
+        self.assertIsNone(Numeric("99.9,9")._enc_template)
+        self.assertIsNone(Numeric("999.")._enc_template)
+        test("999,999.99", Decimal("-12345.6"))
+        test("S9(5)V99", -0.005)
+        test("999.99", 123456)
+        test("9,999V9", 7)
+        test("999.99", float('inf'))
+        test("99.9,9", Decimal("1.23"))
+
+    def test_result_types(self):
+        spec = Numeric("S9(3).99", as_='int_scaled')
+        self.assertEqual(spec.from_bytes(b"-001.25"), -125)
+        self.assertEqual(spec.from_bytes(b"  12.50"), 1250)
+        self.assertEqual(spec.to_bytes(-125), b"-001.25")
+        self.assertEqual(spec.to_bytes(123456), b" 234.56")
+        spec = Numeric("9,999V99", as_='int_scaled')
+        self.assertEqual(spec.from_bytes(b"1,23456"), 123456)
+        self.assertEqual(spec.to_bytes(123456), b"1,23456")
+        spec = Numeric("999,999.99", as_='int_scaled')
+        self.assertEqual(spec.from_bytes(b"123,456.78"), 12345678)
+
+        spec = Numeric("999,999.99", as_='float')
+        value = spec.from_bytes(b"123,456.78")
+        self.assertTrue(isinstance(value, float))
+        self.assertEqual(value, 123456.78)
+        self.assertEqual(spec.to_bytes(value), b"123,456.78")
+        self.assertRaises(ValueError, Numeric, "999", as_='int')
+
+    def test_zoned(self):
+        spec = Numeric("S9(3)V99", zoned=True)
+        self.assertEqual(spec.width, 5)
+        self.assertEqual(spec.from_bytes(b"0012J"), Decimal("-1.21"))
+        self.assertEqual(spec.from_bytes(b"0012A"), Decimal("1.21"))
+        self.assertEqual(spec.from_bytes(b"0012}"), Decimal("-1.20"))
+        self.assertEqual(spec.from_bytes(b"00121"), Decimal("1.21"))
+        self.assertFalse(spec.from_bytes(b"0012-"))
+        self.assertEqual(spec.to_bytes(Decimal("-1.21")), b"0012J")
+        self.assertEqual(spec.to_bytes(Decimal("1.20")), b"0012{")
+
+        spec = Numeric("S9(3)V99", zoned='leading')
+        self.assertEqual(spec.from_bytes(b"}0121"), Decimal("-1.21"))
+        self.assertEqual(spec.from_bytes(b"J0121"), Decimal("-101.21"))
+        self.assertEqual(spec.to_bytes(Decimal("-1.21")), b"}0121")
+
+        spec = Numeric("S9(3)V99", zoned=True, as_='int_scaled')
+        self.assertEqual(spec.from_bytes(b"0012R"), -129)
+        self.assertEqual(spec.to_bytes(-129), b"0012R")
+
+        self.assertRaises(NumericFormatError, Numeric, "999", zoned=True)
+        self.assertRaises(ValueError, Numeric, "S999", zoned='middle')
+
     def test_invalid_pack(self):
         def test(*a):
             self.assertRaises(NumericFormatError, Numeric, *a)
@@ -99,4 +184,62 @@ class NumericTestCase(unittest.TestCase):
         test("SS")
         test("9(S")
 
+class PackedTestCase(unittest.TestCase):
+    def test_width(self):
+        self.assertEqual(Packed("S9(7)V99").width, 5)
+        self.assertEqual(Packed("9(4)").width, 3)
+        self.assertEqual(Packed("S9").width, 1)
+
+    def test_from_bytes(self):
+        spec = Packed("S9(7)V99")
+        self.assertEqual(spec.unpack(b"\x00\x12\x34\x56\x7d"),
+                         Decimal("-12345.67"))
+        self.assertEqual(spec.unpack(b"\x00\x12\x34\x56\x7c"),
+                         Decimal("12345.67"))
+        self.assertEqual(spec.unpack(b"\x00\x00\x00\x20\x2f"),
+                         Decimal("2.02"))
+        self.assertFalse(spec.unpack(b"\x00\x00\x00\x00\x00"))
+        self.assertFalse(spec.unpack(b"\x00\x00\x0a\x00\x0c"))
+        spec = Packed("9(3)V99", as_='int_scaled')
+        self.assertEqual(spec.unpack(b"\x12\x34\x5f"), 12345)
+
+    def test_to_bytes(self):
+        spec = Packed("S9(7)V99")
+        self.assertEqual(spec.pack(Decimal("-12345.67")),
+                         b"\x00\x12\x34\x56\x7d")
+        self.assertEqual(spec.pack(None), b"\x00\x00\x00\x00\x0c")
+        self.assertEqual(Packed("9(3)").pack(-12), b"\x01\x2f")
+        # Overflow drops the high digits
+        self.assertEqual(Packed("9(3)").pack(12345), b"\x34\x5f")
+
+    def test_record(self):
+        spec = Dict([('id', Integer(2)), ('amount', Packed("S9(3)V99")),
+                     ('code', 1)])
+        text = b"01\x12\x34\x5d\x20"
+        rec = spec.unpack(text)
+        self.assertEqual(rec, {'id': 1, 'amount': Decimal("-123.45"),
+                               'code': ''})
+        self.assertEqual(rec.pack(), text)
+        recs = list(spec.iter_file(io.BytesIO(text * 3), terminator=None))
+        self.assertEqual(recs, [rec] * 3)
+
+class BinaryTestCase(unittest.TestCase):
+    def test_width(self):
+        self.assertEqual(Binary("S9(4)").width, 2)
+        self.assertEqual(Binary("S9(9)").width, 4)
+        self.assertEqual(Binary("9(18)").width, 8)
+        self.assertRaises(NumericFormatError, Binary, "9(19)")
+        self.assertRaises(NumericFormatError, Binary, "999.99")
+
+    def test_convert(self):
+        spec = Binary("S9(9)", endian='big')
+        self.assertEqual(spec.unpack(b"\xff\xff\xff\xfe"), -2)
+        self.assertEqual(spec.pack(-2), b"\xff\xff\xff\xfe")
+        self.assertEqual(spec.unpack(b"\x00\x00\x01\x20"), 288)
+        spec = Binary("9(5)V99", endian='little')
+        self.assertEqual(spec.unpack(b"\x39\x30\x00\x00"),
+                         Decimal("123.45"))
+        self.assertEqual(spec.pack(Decimal("123.45")), b"\x39\x30\x00\x00")
+        self.assertEqual(Binary("9(4)").unpack(b"\x01\x00"), 256)
+
 if __name__ == '__main__': unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from .mapping import Dict
+from .numeric import Integer
+from .parallel import parallel_unpack, parallel_map, _read_records
+from .spec import String
+
+def _sum_ages(recs):
+    return sum(r['age'] for r in recs)
+
+class ParallelTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('name', String(6)),
+            ('age', Integer(3))])
+        self._recs = [{'name': 'rec%d' % i, 'age': i} for i in range(100)]
+        data = b"".join(b"rec%-3d%03d\n" % (i, i) for i in range(100))
+        self._path = self._write(data)
+
+    def tearDown(self):
+        os.unlink(self._path)
+
+    def _write(self, data):
+        fd, path = tempfile.mkstemp()
+        os.write(fd, data)
+        os.close(fd)
+        return path
+
+    def test_ordered(self):
+        recs = list(parallel_unpack(self._path, self._spec, workers=2,
+                                    chunk_records=7))
+        self.assertEqual(recs, self._recs)
+        self.assertEqual(recs[5].pack(), b"rec5  005")
+
+    def test_unordered(self):
+        recs = list(parallel_unpack(self._path, self._spec, workers=2,
+                                    chunk_records=7, ordered=False))
+        self.assertEqual(sorted(recs, key=lambda r: r['age']), self._recs)
+
+    def test_map(self):
+        totals = parallel_map(self._path, self._spec, _sum_ages, workers=2,
+                              chunk_records=10)
+        self.assertEqual(sum(totals), sum(range(100)))
+
+    def test_irregular_lines(self):
+        path = self._write(b"a\nbb\n\nccc\ndddd\neeeee\nf")
+        try:
+            spec = Dict([('v', String(3))])
+            recs = list(parallel_unpack(path, spec, workers=2,
+                                        chunk_records=1))
+            self.assertEqual([r['v'] for r in recs],
+                             ['a', 'bb', '', 'ccc', 'ddd', 'eee', 'f'])
+        finally:
+            os.unlink(path)
+
+    def test_read_records_crlf(self):
+        path = self._write(b"ab\r\ncd\r\nef\r\n")
+        try:
+            self.assertEqual(_read_records(path, 0, 5, b"\r\n"),
+                             b"ab\r\ncd\r\n")
+            self.assertEqual(_read_records(path, 5, 12, b"\r\n"),
+                             b"ef\r\n")
+            self.assertEqual(_read_records(path, 3, 4, b"\r\n"), b"")
+        finally:
+            os.unlink(path)
+
+if __name__ == '__main__': unittest.main()
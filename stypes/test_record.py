@@ -0,0 +1,80 @@
+from decimal import Decimal
+import copy
+import pickle
+import unittest
+
+from .mapping import Dict
+from .numeric import Integer, Numeric
+from .record import Record
+from .sequence import Array
+from .spec import SpecificationError, String
+from .util import UnconvertedValue
+
+class RecordTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Record([
+            ('name', String(5)),
+            ('age', Integer(3)),
+            ('lines', Array(2, Record([('qty', Integer(2))])))])
+        self._text = b"abc  0120102"
+
+    def test_unpack(self):
+        rec = self._spec.unpack(self._text)
+        self.assertEqual(rec.name, 'abc')
+        self.assertEqual(rec['age'], 12)
+        self.assertEqual(rec.lines[1].qty, 2)
+        self.assertEqual(rec, {'name': 'abc', 'age': 12,
+                               'lines': [{'qty': 1}, {'qty': 2}]})
+        self.assertEqual(list(rec), ['name', 'age', 'lines'])
+        self.assertFalse(hasattr(rec, '__dict__'))
+
+    def test_set(self):
+        rec = self._spec.unpack(self._text)
+        rec.age = 30
+        rec['name'] = 'xyz'
+        self.assertEqual(rec.pack(), b"xyz  0300102")
+        self.assertRaises(KeyError, rec.__setitem__, 'other', 1)
+        self.assertRaises(AttributeError, setattr, rec, 'other', 1)
+        self.assertRaises(TypeError, rec.__delitem__, 'age')
+
+    def test_unconverted(self):
+        rec = self._spec.unpack(b"abc  x120102")
+        self.assertTrue(rec.has_unconverted())
+        self.assertIsInstance(rec._asdict()['age'], UnconvertedValue)
+        self.assertFalse(self._spec.unpack(self._text).has_unconverted())
+
+    def test_pack(self):
+        value = {'name': 'abc', 'age': 12, 'lines': [{'qty': 1}, {'qty': 2}]}
+        self.assertEqual(self._spec.pack(value), self._text)
+        self.assertEqual(Dict([('age', Integer(3))]).pack(
+            self._spec.unpack(self._text)), b"012")
+
+    def test_field_names(self):
+        for name in ['pack', 'items', '_spec', 'class', 'first name']:
+            self.assertRaises(SpecificationError, Record, [(name, 1)])
+        self.assertRaises(SpecificationError, Record, [('a', 1)], lazy=True)
+
+    def test_copy_and_pickle(self):
+        rec = self._spec.unpack(self._text)
+        self.assertEqual(copy.copy(rec), rec)
+        self.assertIs(copy.deepcopy(rec)._spec, self._spec)
+        spec = pickle.loads(pickle.dumps(self._spec))
+        self.assertEqual(spec.unpack(self._text).pack(), self._text)
+        rec = pickle.loads(pickle.dumps(spec.unpack(self._text)))
+        self.assertEqual(rec.lines[0].qty, 1)
+
+    def test_compile_and_project(self):
+        spec = Record([('a', Numeric('9.9')), ('b', String(2))])
+        rec = spec.compile().unpack(b"1.5xy")
+        self.assertEqual(rec.a, Decimal('1.5'))
+        self.assertEqual(rec.pack(), b"1.5xy")
+        proj = spec.project(['b'])
+        self.assertEqual(proj.unpack(b"1.5xy")._asdict(), {'b': 'xy'})
+
+    def test_encoding(self):
+        spec = Record([('name', String(3))], encoding='cp037')
+        rec = spec.unpack(u'\xe9'.encode('cp037'))
+        self.assertEqual(rec.name, u'\xe9')
+        self.assertEqual(rec.pack(), u'\xe9  '.encode('cp037'))
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from .mapping import Dict
+from .numeric import Integer
+from .recordfile import RecordFile
+from .sequence import Tuple
+from .spec import String
+
+class RecordFileTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('name', String(6)),
+            ('age', Integer(3))])
+        self._path = self._write(b"jeremy031\ntom   045\nbob   007\n")
+
+    def tearDown(self):
+        os.unlink(self._path)
+
+    def _write(self, data):
+        fd, path = tempfile.mkstemp()
+        os.write(fd, data)
+        os.close(fd)
+        return path
+
+    def test_index(self):
+        with RecordFile(self._path, self._spec) as rf:
+            self.assertEqual(len(rf), 3)
+            self.assertEqual(rf[0], {'name': 'jeremy', 'age': 31})
+            self.assertEqual(rf[-1]['name'], 'bob')
+            self.assertRaises(IndexError, lambda: rf[3])
+
+    def test_slice_and_reverse(self):
+        with RecordFile(self._path, self._spec) as rf:
+            self.assertEqual([r['age'] for r in rf[1:]], [45, 7])
+            self.assertEqual([r['age'] for r in rf[::-2]], [7, 31])
+            self.assertEqual([r['age'] for r in reversed(rf)], [7, 45, 31])
+            self.assertEqual([r['age'] for r in rf], [31, 45, 7])
+
+    def test_cache(self):
+        with RecordFile(self._path, self._spec, cache_size=1) as rf:
+            self.assertIs(rf[0], rf[0])
+            first = rf[0]
+            rf[1]
+            self.assertIsNot(rf[0], first)
+
+    def test_cache_none(self):
+        path = self._write(b"   \n")
+        try:
+            with RecordFile(path, Integer(3)) as rf:
+                self.assertIsNone(rf[0])
+                self.assertIsNone(rf[0])
+                self.assertEqual((rf._cache.hits, rf._cache.misses), (1, 1))
+        finally:
+            os.unlink(path)
+
+    def test_unterminated(self):
+        path = self._write(b"ab01cd02ef")
+        try:
+            with RecordFile(path, Tuple([String(2), Integer(2)]),
+                            terminator=None) as rf:
+                self.assertEqual(len(rf), 3)
+                self.assertEqual(rf[1], ('cd', 2))
+                self.assertEqual(rf[2], ('ef', None))
+        finally:
+            os.unlink(path)
+
+    def test_empty(self):
+        path = self._write(b"")
+        try:
+            with RecordFile(path, self._spec) as rf:
+                self.assertEqual(len(rf), 0)
+                self.assertEqual(list(rf), [])
+        finally:
+            os.unlink(path)
+
+if __name__ == '__main__': unittest.main()
@@ -96,6 +96,12 @@ class TupleTestCase(unittest.TestCase):
         self.assertEqual(value, text_rec)
         self.assertEqual(value.pack(), string)
 
+    def test_unpack_from(self):
+        spec = Tuple([String(2), Integer(2)])
+        buf = memoryview(bytearray(b"ab01cd02"))
+        self.assertEqual(spec.unpack_from(buf, 4), ('cd', 2))
+        self.assertEqual(spec.unpack_from(buf, 6), ('02', None))
+
     def test_tuple_convert(self):
         spec = Tuple([Integer(5)])
         value = spec.unpack(b"00040")
@@ -129,6 +135,36 @@ class NamedTupleTestCase(unittest.TestCase):
         buf = b"jeremy      lowery         s023"
         self.assertEqual(tup.pack(), buf)
 
+    def test_pack_into(self):
+        buf = bytearray(b"jeremy      lowery         s 23")
+        self._spec.pack_field_into(buf, 0, 'age', 24)
+        self._spec.pack_field_into(buf, 0, 1, 'smith')
+        self.assertEqual(buf, b"jeremy      smith          s024")
+        tup = self._spec.unpack(buf)
+        buf2 = bytearray(len(buf) + 2)
+        self._spec.pack_into(buf2, 2, tup)
+        self.assertEqual(buf2[2:], buf)
+        self.assertRaises(KeyError, self._spec.pack_field_into,
+                          buf, 0, 'missing', 'x')
+
+    def test_project(self):
+        proj = self._spec.project(['age', 'first_name'])
+        tup = proj.unpack(b"jeremy      lowery         s 23")
+        self.assertEqual(tup, ("jeremy", 23))
+        self.assertEqual(tup.age, 23)
+        self.assertEqual(tup.pack(), b"jeremy" + b" " * 22 + b"023")
+
+    def test_project_repeated(self):
+        proj = self._spec.project(['age', 'age'])
+        self.assertEqual(proj.unpack(b"jeremy      lowery         s 23"), (23,))
+
+    def test_unpack_columns(self):
+        cols = self._spec.unpack_columns(
+            b"jeremy      lowery         s 23\n"
+            b"tom         jones          V 45\n")
+        self.assertEqual(cols.first_name, ['jeremy', 'tom'])
+        self.assertEqual(list(cols.age), [23, 45])
+
     def test_bad_data(self):
         buf = b"jeremy      lowery         sX23"
         tup = self._spec.unpack(buf)
@@ -0,0 +1,122 @@
+from io import BytesIO
+import unittest
+
+from .mapping import Dict
+from .numeric import Integer
+from .sequence import Tuple
+from .spec import String
+from .stream import iter_unpack, RecordWriter
+
+class IterUnpackTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('name', String(6)),
+            ('age', Integer(3))])
+
+    def test_terminated(self):
+        data = BytesIO(b"jeremy031\ntom   045\n")
+        recs = list(iter_unpack(data, self._spec))
+        self.assertEqual(recs, [{'name': 'jeremy', 'age': 31},
+                                {'name': 'tom', 'age': 45}])
+        self.assertEqual(recs[0].pack(), b"jeremy031")
+
+    def test_crlf(self):
+        data = BytesIO(b"jeremy031\r\ntom   045\r\n")
+        recs = list(iter_unpack(data, self._spec, terminator=b"\r\n"))
+        self.assertEqual([r['age'] for r in recs], [31, 45])
+
+    def test_no_terminator(self):
+        data = BytesIO(b"jeremy031tom   045")
+        recs = list(iter_unpack(data, self._spec, terminator=None))
+        self.assertEqual([r['name'] for r in recs], ['jeremy', 'tom'])
+
+    def test_short_and_long_lines(self):
+        data = BytesIO(b"jeremy\ntom   045XXXX\n\nbob   7")
+        recs = list(iter_unpack(data, self._spec))
+        self.assertEqual(recs, [{'name': 'jeremy', 'age': None},
+                                {'name': 'tom', 'age': 45},
+                                {'name': '', 'age': None},
+                                {'name': 'bob', 'age': 7}])
+
+    def test_short_last_line(self):
+        spec = Dict([('a', 10)])
+        for chunk_size in [None, 4]:
+            recs = list(iter_unpack(BytesIO(b"abcdefghij\nxyz\n"), spec,
+                                    chunk_size=chunk_size))
+            self.assertEqual([r['a'] for r in recs], ['abcdefghij', 'xyz'])
+
+    def test_short_lines_filling_a_record(self):
+        recs = list(iter_unpack(BytesIO(b"abc\ndefghi\n"), Dict([('a', 10)])))
+        self.assertEqual([r['a'] for r in recs], ['abc', 'defghi'])
+
+    def test_small_chunks(self):
+        lines = [b"rec%03d%03d" % (i, i) for i in range(50)]
+        data = BytesIO(b"\n".join(lines) + b"\n")
+        recs = list(iter_unpack(data, self._spec, chunk_size=7))
+        self.assertEqual(len(recs), 50)
+        self.assertEqual(recs[-1], {'name': 'rec049', 'age': 49})
+
+    def test_iter_file(self):
+        spec = Tuple([String(2), Integer(2)])
+        recs = list(spec.iter_file(BytesIO(b"ab01\ncd02\n")))
+        self.assertEqual(recs, [('ab', 1), ('cd', 2)])
+        self.assertEqual(recs[1].pack(), b"cd02")
+
+    def test_scalar_spec(self):
+        recs = list(Integer(2).iter_file(BytesIO(b"01\n02\n")))
+        self.assertEqual(recs, [1, 2])
+
+    def test_structured_data_spec(self):
+        recs = list(iter_unpack(BytesIO(b"ab\ncd\n"), [('a', 1), ('b', 1)]))
+        self.assertEqual(recs, [{'a': 'a', 'b': 'b'}, {'a': 'c', 'b': 'd'}])
+
+class PackManyTestCase(unittest.TestCase):
+    def test_pack_many(self):
+        spec = Tuple([String(2), Integer(2)])
+        self.assertEqual(spec.pack_many([('ab', 1), ('cd', 2)]),
+                         b"ab01\ncd02\n")
+        self.assertEqual(spec.pack_many([('ab', 1)], terminator=None),
+                         b"ab01")
+        self.assertEqual(spec.pack_many([]), b"")
+
+class RecordWriterTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('name', String(6)),
+            ('age', Integer(3))])
+        self._recs = [{'name': 'rec%d' % i, 'age': i} for i in range(10)]
+        self._expected = b"".join(b"rec%-3d%03d\n" % (i, i)
+                                  for i in range(10))
+
+    def test_buffered(self):
+        out = BytesIO()
+        writer = RecordWriter(out, self._spec, buffer_records=3)
+        writer.write_many(self._recs)
+        self.assertEqual(out.getvalue(), self._expected[:90])
+        writer.close()
+        self.assertEqual(out.getvalue(), self._expected)
+
+    def test_background(self):
+        out = BytesIO()
+        with RecordWriter(out, self._spec, buffer_records=4,
+                          background=True) as writer:
+            writer.write_many(self._recs)
+        self.assertEqual(out.getvalue(), self._expected)
+
+    def test_background_error(self):
+        class BrokenFile(object):
+            def write(self, data):
+                raise IOError("disk full")
+        writer = RecordWriter(BrokenFile(), self._spec, buffer_records=1,
+                              background=True)
+        writer.write(self._recs[0])
+        self.assertRaises(IOError, writer.close)
+
+    def test_round_trip(self):
+        out = BytesIO()
+        with RecordWriter(out, self._spec) as writer:
+            writer.write_many(self._recs)
+        out.seek(0)
+        self.assertEqual(list(iter_unpack(out, self._spec)), self._recs)
+
+if __name__ == '__main__': unittest.main()
@@ -1,7 +1,11 @@
 
+import array
+import pickle
 import unittest
 
-from .spec import BoxedString
+from .mapping import Dict
+from .spec import BoxedString, DictionaryColumn, MappedString, String
+from .util import UnconvertedValue
 
 class DateTestCase(unittest.TestCase):
     def setUp(self):
@@ -19,4 +23,59 @@ class DateTestCase(unittest.TestCase):
     def test_from_bytes(self):
         self.assertEqual(self._s.from_bytes(b"aaaaabbbbb"), "aaaaa\r\nbbbbb")
 
+class InternTestCase(unittest.TestCase):
+    def test_unpack(self):
+        spec = String(4, intern=2)
+        first = spec.unpack(b"ab  ")
+        self.assertEqual(first, 'ab')
+        self.assertIs(spec.unpack(b"ab"), first)
+        spec.unpack(b"cd")
+        spec.unpack(b"ef")
+        self.assertEqual(len(spec._interned), 2)
+        self.assertEqual(spec.unpack(b"ef"), 'ef')
+        self.assertEqual(spec.pack('ab'), b"ab  ")
+
+    def test_same_values(self):
+        for text in [b"ab\x1c  ", b"ab\xc2\xa0", b"ab  "]:
+            self.assertEqual(String(5, intern=10).unpack(text),
+                             String(5).unpack(text))
+
+    def test_in_record(self):
+        spec = Dict([('a', String(2, intern=8)), ('b', String(2))])
+        recs = [spec.unpack(b"xyzw"), spec.unpack(b"xyzw")]
+        self.assertIs(recs[0]['a'], recs[1]['a'])
+        self.assertIs(spec.compile().unpack(b"xyzw")['a'], recs[0]['a'])
+        self.assertEqual(spec.unpack_columns(b"xyzw\n")['a'], ['xy'])
+
+    def test_pickle(self):
+        spec = String(4, intern=2)
+        spec.unpack(b"ab")
+        spec = pickle.loads(pickle.dumps(spec))
+        self.assertEqual(spec._interned, {})
+        self.assertEqual(spec.unpack(b"ab"), 'ab')
+
+class DictionaryColumnTestCase(unittest.TestCase):
+    def test_string(self):
+        column = String(2, dictionary=True).unpack_column(
+            [b"NY", b"CA", b"NY", b"  "])
+        self.assertIsInstance(column, DictionaryColumn)
+        self.assertEqual(column.codes, array.array('i', [0, 1, 0, 2]))
+        self.assertEqual(column.values, ['NY', 'CA', ''])
+        self.assertEqual(list(column), ['NY', 'CA', 'NY', ''])
+        self.assertEqual(column[2], 'NY')
+        self.assertEqual(column[1:3], ['CA', 'NY'])
+        self.assertEqual(len(column), 4)
+
+    def test_mapped_string(self):
+        spec = MappedString(1, {'A': 'active'}, dictionary=True)
+        column = spec.unpack_column([b"A", b"X", b"A"])
+        self.assertEqual(column.codes, array.array('i', [0, 1, 0]))
+        self.assertIsInstance(column[1], UnconvertedValue)
+
+    def test_unpack_columns(self):
+        spec = Dict([('state', String(2, dictionary=True))])
+        column = spec.unpack_columns(b"NY\nCA\nNY\n")['state']
+        self.assertEqual(column.values, ['NY', 'CA'])
+        self.assertEqual(list(column), ['NY', 'CA', 'NY'])
+
 if __name__ == '__main__': unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from .mapping import Dict
+from .numeric import Integer, Numeric
+from .sequence import NamedTuple
+from .spec import String
+from .util import UnconvertedValue
+from .vectorized import np, unpack_arrays
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class UnpackArraysTestCase(unittest.TestCase):
+    def setUp(self):
+        self._spec = Dict([
+            ('name', String(4)),
+            ('count', Integer(4)),
+            ('amount', Numeric('S9(3).99')),
+            ('rate', Numeric('9,999V9'))])
+        self._data = (b"aaaa0012 001.251,2345\n"
+                      b"bbbb  34-100.000,0012\n"
+                      b"cccc    -  2.50    \n"
+                      b"ddddX12  002.X01,0005\n"
+                      b"eeee-5  +123.45 \n")
+
+    def test_matches_unpack(self):
+        cols = unpack_arrays(self._data, self._spec)
+        recs = [self._spec.unpack(l) for l in self._data.splitlines()]
+        self.assertEqual(cols['name'], [r['name'] for r in recs])
+        for name in ['count', 'amount', 'rate']:
+            for idx, rec in enumerate(recs):
+                value = rec[name]
+                if value is None or isinstance(value, UnconvertedValue):
+                    self.assertIs(cols[name].mask[idx], np.True_,
+                                  (name, idx))
+                else:
+                    self.assertAlmostEqual(cols[name][idx], float(value))
+
+    def test_types(self):
+        cols = unpack_arrays(self._data, self._spec)
+        self.assertEqual(cols['count'].dtype, np.int64)
+        self.assertEqual(list(cols['count'][:2]), [12, 34])
+        self.assertEqual(cols['count'][4], -5)
+        self.assertEqual(cols['amount'].dtype, np.float64)
+        self.assertEqual(list(cols['amount'][:3]), [1.25, -100.0, -2.5])
+        self.assertEqual(cols['rate'][0], 1234.5)
+
+    def test_int_scaled(self):
+        spec = Dict([('amount', Numeric('S9(3).99', as_='int_scaled'))])
+        cols = unpack_arrays(b"-001.25\n 100.00\n  X.00\n", spec)
+        self.assertEqual(cols['amount'].dtype, np.int64)
+        self.assertEqual(list(cols['amount'][:2]), [-125, 10000])
+        self.assertIs(cols['amount'].mask[2], np.True_)
+
+    def test_engine(self):
+        spec = NamedTuple([('a', Integer(2)), ('b', 2)])
+        cols = spec.unpack_columns(b"01xx02yy", terminator=None,
+                                   engine='numpy')
+        self.assertEqual(list(cols.a), [1, 2])
+        self.assertEqual(cols.b, ['xx', 'yy'])
+
+    def test_encoding(self):
+        spec = Dict([('name', String(3)), ('count', Integer(4))],
+                    encoding='cp037')
+        data = u'Zo\xeb0012abc  34'.encode('cp037')
+        cols = unpack_arrays(data, spec, terminator=None)
+        self.assertEqual(cols['name'], [u'Zo\xeb', 'abc'])
+        self.assertEqual(list(cols['count']), [12, 34])
+
+    def test_dictionary(self):
+        spec = Dict([('state', String(2, dictionary=True)),
+                     ('n', Integer(1))])
+        cols = unpack_arrays(b"NY1\nCA2\nNY3\n", spec)
+        self.assertEqual(cols['state'].values, ['NY', 'CA'])
+        self.assertEqual(list(cols['state'].codes), [0, 1, 0])
+
+    def test_empty(self):
+        cols = unpack_arrays(b"", self._spec)
+        self.assertEqual(len(cols['amount']), 0)
+
+if __name__ == '__main__': unittest.main()
@@ -1,4 +1,5 @@
 from builtins import object
+from collections import OrderedDict
 from functools import partial
 
 class InvalidSpecError(Exception):
@@ -58,3 +59,41 @@ class imemoize(object):
         except KeyError:
             res = cache[key] = self.func(*args, **kw)
         return res
+
+class LRUCache(object):
+    """ A bounded mapping which holds on to the maxsize most recently used
+    items. Looking up an item marks it as recently used. The hits and
+    misses of get() are counted. """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data[key] = value
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data.pop(key, None)
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
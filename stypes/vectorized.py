@@ -0,0 +1,195 @@
+""" NumPy engine for decoding whole columns of numeric fields.
+
+A block of records is viewed as a two dimensional array of bytes with a row
+per record, so the digits of an Integer or Numeric field across all of the
+records are a single slice of that array. The values are computed with
+vectorized arithmetic on the digit columns. Rows that the vectorized rules
+cannot decide on (signs, stray spaces, bad data) are handed to the regular
+unpack() of the field, so the results match what unpack() gives.
+
+Requires numpy.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .numeric import (Integer, Numeric, NINEConverter, DECIMALConverter,
+                      COMMAConverter, SIGNConverter, SPACEConverter, VConverter)
+from .spec import Spec
+from .stream import iter_blocks
+from .util import UnconvertedValue
+
+__all__ = ['unpack_arrays']
+
+_ZERO, _SPACE = ord('0'), ord(' ')
+
+# Largest number of digits which always fits into an int64
+_MAX_DIGITS = 18
+
+def unpack_arrays(source, spec, terminator=b"\n"):
+    """ Decode all of the records in source, a file object or a bytes-like
+    object, into columns like spec.unpack_columns() does. Integer fields
+    and Numeric fields with as_='int_scaled' become int64 arrays and other
+    Numeric fields float64 arrays. These are numpy
+    masked arrays, masked where unpack() would have given None (a blank
+    field) or an UnconvertedValue. Other fields are decoded into lists.
+    """
+    if np is None:
+        raise ImportError("Install numpy to use the vectorized engine")
+    if not isinstance(spec, Spec):
+        from .mapping import Dict
+        spec = Dict(spec)
+    names, field_specs = _fields(spec)
+    decoders = [_decoder(s) for s in field_specs]
+    parts = [[] for _ in field_specs]
+    for block, stride in iter_blocks(source, spec.width, terminator):
+        if spec._encoding is not None:
+            block = block.translate(spec._decode_table)
+        rows = np.frombuffer(block, dtype=np.uint8).reshape(-1, stride)
+        for idx, (start, end) in enumerate(spec._field_slices):
+            matrix = rows[:, start:end]
+            decoder = decoders[idx]
+            if decoder is None:
+                # Decoded at the end, so the whole column is in one piece
+                column = _row_bytes(matrix)
+                if spec._encoding is not None:
+                    column = [spec._field_decoders[idx](t) for t in column]
+                parts[idx].extend(column)
+            else:
+                parts[idx].append(decoder(matrix))
+
+    columns = []
+    for field_spec, decoder, chunks in zip(field_specs, decoders, parts):
+        if decoder is None:
+            columns.append(field_spec.unpack_column(chunks))
+        elif chunks:
+            columns.append(np.ma.concatenate(chunks))
+        else:
+            columns.append(np.ma.MaskedArray(np.zeros(0, decoder.dtype)))
+    return _result(spec, names, columns)
+
+def _fields(spec):
+    from .mapping import _BaseDict
+    if isinstance(spec, _BaseDict):
+        return spec._keys, [s for n, s in spec._spec_map]
+    names = getattr(spec, '_field_names', None)
+    return names, spec._pos_specs
+
+def _result(spec, names, columns):
+    from .mapping import _BaseDict
+    from .sequence import NamedTuple
+    if isinstance(spec, _BaseDict):
+        return dict(zip(names, columns))
+    if isinstance(spec, NamedTuple):
+        return spec._str_itype(*columns)
+    return columns
+
+def _row_bytes(matrix):
+    width = matrix.shape[1]
+    text = matrix.tobytes()
+    return [text[i:i+width] for i in range(0, len(text), width)]
+
+def _decoder(spec):
+    if type(spec) is Integer and spec.width <= _MAX_DIGITS:
+        return _IntegerDecoder(spec)
+    if type(spec) is Numeric:
+        plan = _numeric_plan(spec)
+        if plan is not None:
+            return _NumericDecoder(spec, *plan)
+    return None
+
+class _IntegerDecoder(object):
+    dtype = np.int64 if np else None
+
+    def __init__(self, spec):
+        self._spec = spec
+        self._weights = 10 ** np.arange(spec.width - 1, -1, -1, dtype=np.int64)
+
+    def __call__(self, matrix):
+        digits = matrix.astype(np.int64) - _ZERO
+        is_digit = (digits >= 0) & (digits <= 9)
+        is_space = matrix == _SPACE
+        blank = is_space.all(axis=1)
+        # int() takes leading spaces but not spaces between digits, which
+        # would also make trailing spaces count as zeros here.
+        seen_digit = np.maximum.accumulate(is_digit, axis=1)
+        simple = (is_digit | is_space).all(axis=1) & \
+                 ~(seen_digit & is_space).any(axis=1)
+        values = np.where(is_digit, digits, 0).dot(self._weights)
+        return _finish(self._spec, matrix, values, simple & ~blank, blank)
+
+class _NumericDecoder(object):
+    def __init__(self, spec, digit_cols, literals, sign_col, precision):
+        self._spec = spec
+        self._scaled = spec._as == 'int_scaled'
+        self.dtype = np.int64 if self._scaled else np.float64
+        self._digit_cols = digit_cols
+        self._literals = literals
+        self._sign_col = sign_col
+        self._weights = 10 ** np.arange(len(digit_cols) - 1, -1, -1,
+                                        dtype=np.int64)
+        self._scale = 10.0 ** precision
+
+    def __call__(self, matrix):
+        digits = matrix[:, self._digit_cols].astype(np.int64) - _ZERO
+        is_space = matrix[:, self._digit_cols] == _SPACE
+        blank = (matrix == _SPACE).all(axis=1)
+        simple = (((digits >= 0) & (digits <= 9)) | is_space).all(axis=1)
+        for col, char in self._literals:
+            simple &= matrix[:, col] == char
+        # unpack() strips trailing spaces and right aligns what is left,
+        # so a record ending in a space does not line up with the picture
+        simple &= matrix[:, -1] != _SPACE
+        values = np.where(is_space, 0, digits).dot(self._weights)
+        if self._sign_col is not None:
+            values = np.where(matrix[:, self._sign_col] == ord('-'),
+                              -values, values)
+        if not self._scaled:
+            values = values / self._scale
+        return _finish(self._spec, matrix, values, simple & ~blank, blank)
+
+def _finish(spec, matrix, values, simple, blank):
+    """ Decode the rows which the vectorized rules could not with unpack()
+    and build the masked array """
+    mask = blank.copy()
+    for row in np.nonzero(~simple & ~blank)[0]:
+        value = spec.unpack(matrix[row].tobytes())
+        if value is None or isinstance(value, UnconvertedValue):
+            mask[row] = True
+        else:
+            values[row] = value
+    return np.ma.MaskedArray(values, mask=mask)
+
+def _numeric_plan(spec):
+    """ The columns of the digits, the (column, byte) pairs of the
+    punctuation, the sign column and the precision of a Numeric picture.
+    None if the picture has more than one decimal point or too many digits
+    for an int64. """
+    digit_cols = []
+    literals = []
+    sign_col = None
+    precision = 0
+    points = 0
+    pos = 0
+    for conv in spec._converters:
+        if isinstance(conv, NINEConverter):
+            digit_cols.extend(range(pos, pos + conv.width))
+            if points:
+                precision += conv.width
+        elif isinstance(conv, (DECIMALConverter, VConverter)):
+            points += 1
+            if isinstance(conv, DECIMALConverter):
+                literals.append((pos, ord('.')))
+        elif isinstance(conv, COMMAConverter):
+            if points:
+                return None
+            literals.append((pos, ord(',')))
+        elif isinstance(conv, SIGNConverter):
+            sign_col = pos
+        elif not isinstance(conv, SPACEConverter):
+            return None
+        pos += conv.width
+    if points > 1 or len(digit_cols) > _MAX_DIGITS:
+        return None
+    return digit_cols, literals, sign_col, precision